@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class HabitsConfig(AppConfig):
   default_auto_field = "django.db.models.BigAutoField"
   name = "habits"
+
+  def ready(self):
+    from . import signals  # noqa: F401, registers the chart cache invalidation
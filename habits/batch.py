@@ -0,0 +1,243 @@
+"""
+Vectorized streak engine for recomputing the streaks of many habits at once.
+
+Instead of scanning each habit's history in a Python loop, the completions of
+all habits are loaded as (habit_id, period_ordinal) arrays and the runs of
+consecutive periods are found with run-length encoding over the sorted arrays.
+The counters are then read from those runs, as StreakRun.state() does, so the
+stored runs and counters always agree.
+"""
+from typing import NamedTuple
+
+import numpy as np
+from django.db import transaction
+
+from .chart_cache import bump_data_version
+from .leaderboard import invalidate_leaderboards
+from .models import Habit, Completion, StreakRun
+from .streaks import cutoff_period
+
+EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+STREAK_FIELDS = ["habit_last_period", "habit_run_streak", "habit_best_streak", "habit_last_streak"]
+
+class BatchRuns(NamedTuple):
+	"""
+	The runs of consecutive periods of several habits, one array element per run.
+
+	Attributes:
+		habit_ids (ndarray): The habit of each run, ascending.
+		first (ndarray): The first period of each run, ascending per habit.
+		last (ndarray): The last period of each run.
+	"""
+	habit_ids: np.ndarray
+	first: np.ndarray
+	last: np.ndarray
+
+class BatchStreaks(NamedTuple):
+	"""
+	The streak counters of several habits, one array element per habit.
+
+	Attributes:
+		habit_ids (ndarray): The habits that have at least one counted completion, ascending.
+		current (ndarray): The current streak of each habit.
+		best (ndarray): The best streak of each habit.
+		last_period (ndarray): The latest completed period of each habit.
+		run (ndarray): The length of the run ending at last_period.
+		runs (BatchRuns): The runs the counters were computed from, future periods included.
+	"""
+	habit_ids: np.ndarray
+	current: np.ndarray
+	best: np.ndarray
+	last_period: np.ndarray
+	run: np.ndarray
+	runs: BatchRuns
+
+def period_ordinals(occurrence, days):
+	"""
+	Vectorized version of streaks.day_period().
+
+	Args:
+		occurrence (str): One of 'daily', 'weekly', 'monthly'.
+		days (Sequence[int]): The stored day ordinals of the completions.
+
+	Returns:
+		ndarray: The period ordinal of each day.
+	"""
+	days = np.asarray(days, dtype=np.int64)
+
+	if occurrence == "weekly":
+		return (days - 1) // 7
+	if occurrence == "monthly":
+		months = (days - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+		return months.astype(np.int64) + 1970 * 12
+	return days
+
+def batch_runs(habit_ids, periods):
+	"""
+	Vectorized version of streaks.period_runs(), for every habit at once.
+
+	Args:
+		habit_ids (Sequence[int]): The habit of each completion.
+		periods (Sequence[int]): The period ordinal of each completion, in any order.
+
+	Returns:
+		BatchRuns: The runs of every habit.
+	"""
+	habit_ids = np.asarray(habit_ids, dtype=np.int64)
+	periods = np.asarray(periods, dtype=np.int64)
+
+	if not len(periods):
+		return BatchRuns(habit_ids, periods, periods)
+
+	# Sort by habit, then period, and count several completions in a period once
+	order = np.lexsort((periods, habit_ids))
+	habit_ids, periods = habit_ids[order], periods[order]
+	distinct = np.r_[True, (habit_ids[1:] != habit_ids[:-1]) | (periods[1:] != periods[:-1])]
+	habit_ids, periods = habit_ids[distinct], periods[distinct]
+
+	# A run starts at every new habit and after every gap
+	starts = np.flatnonzero(np.r_[True, habit_ids[1:] != habit_ids[:-1]] | np.r_[True, np.diff(periods) != 1])
+	ends = np.r_[starts[1:], len(periods)] - 1
+
+	return BatchRuns(habit_ids[starts], periods[starts], periods[ends])
+
+def runs_streaks(runs, cutoff=None):
+	"""
+	Compute the current and best streak of every habit from its runs, as StreakRun.state() does.
+
+	Args:
+		runs (BatchRuns): The runs, see batch_runs().
+		cutoff (int | None): The current period, see streaks.cutoff_period().
+
+	Returns:
+		BatchStreaks: The streak counters per habit.
+	"""
+	habit_ids, first, last = runs
+
+	if cutoff is not None:  # Future periods do not count, a run crossing the cutoff is cut short
+		counted = first <= cutoff
+		habit_ids, first, last = habit_ids[counted], first[counted], np.minimum(last[counted], cutoff)
+
+	if not len(habit_ids):
+		empty = np.empty(0, dtype=np.int64)
+		return BatchStreaks(empty, empty, empty, empty, empty, runs)
+
+	# Group the runs by habit
+	lengths = last - first + 1
+	first_runs = np.flatnonzero(np.r_[True, habit_ids[1:] != habit_ids[:-1]])
+	last_runs = np.r_[first_runs[1:], len(habit_ids)] - 1
+
+	best = np.maximum.reduceat(lengths, first_runs)
+	run = lengths[last_runs]
+	last_period = last[last_runs]
+	current = run if cutoff is None else np.where(last_period >= cutoff - 1, run, 0)
+
+	return BatchStreaks(habit_ids[last_runs], current, best, last_period, run, runs)
+
+def batch_streaks(habit_ids, periods, cutoff=None):
+	"""
+	Compute the current and best streak of every habit at once.
+
+	Args:
+		habit_ids (Sequence[int]): The habit of each completion.
+		periods (Sequence[int]): The period ordinal of each completion, in any order.
+		cutoff (int | None): The current period, see cutoff_period().
+
+	Returns:
+		BatchStreaks: The streak counters per habit.
+	"""
+	return runs_streaks(batch_runs(habit_ids, periods), cutoff)
+
+def compute_streaks(occurrence, habit_ids):
+	"""
+	Load the completions of the given habits in one query and compute their streaks.
+
+	Args:
+		occurrence (str): The occurrence shared by the habits.
+		habit_ids (list[int] | QuerySet): The habits to compute, or a subquery selecting them.
+
+	Returns:
+		BatchStreaks: The streak counters and runs per habit.
+	"""
+	rows = Completion.objects.filter(
+		completion_habit_id__in=habit_ids, completion_deleted=False
+	).values_list("completion_habit_id", "completion_day")
+
+	ids, days = zip(*rows) if rows else ((), ())
+	return batch_streaks(ids, period_ordinals(occurrence, days), cutoff_period(occurrence))
+
+def apply_streaks(habits, result):
+	"""
+	Copy the computed streaks onto the habit instances, without saving them.
+
+	Args:
+		habits (list[Habit]): The habits to update.
+		result (BatchStreaks): The streak counters, see batch_streaks().
+	"""
+	index = {habit_id: i for i, habit_id in enumerate(result.habit_ids.tolist())}
+
+	for habit in habits:
+		i = index.get(habit.habit_id)
+		if i is None:  # No counted completions
+			habit.habit_last_period, habit.habit_run_streak, habit.habit_best_streak, current = None, 0, 0, 0
+		else:
+			habit.habit_last_period = int(result.last_period[i])
+			habit.habit_run_streak = int(result.run[i])
+			habit.habit_best_streak = int(result.best[i])
+			current = int(result.current[i])
+
+		if habit.habit_status == "active":
+			habit.habit_last_streak = current
+		elif habit.habit_status == "inactive":
+			habit.habit_last_streak = 0
+
+def store_runs(habit_ids, result):
+	"""
+	Replace the stored streak runs of the given habits with the computed ones.
+
+	The streak reads go through StreakRun, so the runs are stored together with
+	the counters computed from them, in the same transaction.
+
+	Args:
+		habit_ids (list[int] | QuerySet): The habits, or a subquery selecting them.
+		result (BatchStreaks): The streak counters and their runs, see batch_streaks().
+
+	Returns:
+		int: The number of runs stored.
+	"""
+	runs = result.runs
+	return StreakRun.store(habit_ids, zip(runs.habit_ids.tolist(), runs.first.tolist(), runs.last.tolist()))
+
+def recompute_streaks(habits=None, batch_size=500):
+	"""
+	Recompute and store the streak runs and streaks of many habits, one query per occurrence.
+
+	Paused habits keep their last streak and inactive habits are reset to 0,
+	as in Habit.rebuild_streaks().
+
+	Args:
+		habits (QuerySet, optional): The habits to recompute. Defaults to all habits.
+		batch_size (int): The number of habits per UPDATE statement.
+
+	Returns:
+		int: The number of habits updated.
+	"""
+	habits = Habit.objects.all() if habits is None else habits
+	updated = 0
+
+	for occurrence, _ in Habit.OCCURENCE_CHOICES:
+		selected = habits.filter(habit_occurrence=occurrence)
+		group = list(selected.only("habit_id", "habit_status", *STREAK_FIELDS))
+		if not group:
+			continue
+
+		result = compute_streaks(occurrence, selected.values("habit_id"))
+		apply_streaks(group, result)
+		with transaction.atomic():
+			store_runs(selected.values("habit_id"), result)
+			Habit.objects.bulk_update(group, STREAK_FIELDS, batch_size=batch_size)
+		updated += len(group)
+
+	bump_data_version()  # bulk_update() sends no signals
+	invalidate_leaderboards()
+	return updated
@@ -0,0 +1,99 @@
+"""
+Cache for rendered charts and chart data, invalidated by data version counters.
+
+Every chart is stored under a key containing the current data version, either
+the global one (analytics charts) or the one of a single habit (detail chart).
+The signals in signals.py bump the versions whenever a Habit or Completion is
+saved or deleted, so stale fragments are never read again and simply age out
+of the cache's LRU.
+"""
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "habits:version"
+
+def _version_key(habit_id=None):
+	"""
+	Return the cache key of the global data version, or of one habit's.
+	"""
+	return VERSION_KEY if habit_id is None else f"{VERSION_KEY}:{habit_id}"
+
+def data_version(habit_id=None):
+	"""
+	Return the current data version, starting a new one if it is not cached.
+
+	New versions start from the clock rather than 0, so a version that was
+	evicted from the cache never comes back with a number used before.
+
+	Args:
+		habit_id (int, optional): The habit whose version to read. Defaults to the global version.
+
+	Returns:
+		int: The data version.
+	"""
+	key = _version_key(habit_id)
+	version = cache.get(key)
+	if version is None:
+		cache.add(key, time.time_ns(), timeout=None)
+		version = cache.get(key)
+	return version
+
+def bump_data_version(habit_id=None):
+	"""
+	Invalidate the cached charts of all habits, and of one habit if given.
+
+	The versions are bumped once the current transaction commits, so that a
+	concurrent request cannot cache the old data under the new version.
+
+	Args:
+		habit_id (int, optional): The habit whose data changed.
+	"""
+	def bump():
+		for key in {_version_key(), _version_key(habit_id)}:
+			try:
+				cache.incr(key)
+			except ValueError:  # Evicted, start a new version
+				cache.set(key, time.time_ns(), timeout=None)
+
+	transaction.on_commit(bump)
+
+def cached_chart(name, build, *key_parts, habit_id=None):
+	"""
+	Return a chart fragment from the cache, building and storing it on a miss.
+
+	The key includes today's date, as streaks and chart windows move with the
+	calendar even when no data changes.
+
+	Args:
+		name (str): The chart name.
+		build (Callable[[], str]): Renders the chart HTML.
+		*key_parts: The chart parameters, e.g. the range and bucket.
+		habit_id (int, optional): Key the chart on this habit's version instead of the global one.
+
+	Returns:
+		str: The HTML representation of the chart.
+	"""
+	parts = [name, data_version(habit_id), datetime.now().date().isoformat(), *key_parts]
+	key = "habits:chart:" + ":".join(str(part) for part in parts)
+
+	html = cache.get(key)
+	if html is None:
+		html = build()
+		cache.set(key, html, getattr(settings, "HABITS_CHART_CACHE_TIMEOUT", 60 * 60 * 24))
+	return html
+
+def chart_etag(habit_id=None):
+	"""
+	Return an ETag for chart data, which changes with the data version and the date.
+
+	Args:
+		habit_id (int, optional): Use this habit's version instead of the global one.
+
+	Returns:
+		str: The ETag value.
+	"""
+	return f"{data_version(habit_id)}-{datetime.now().date().isoformat()}"
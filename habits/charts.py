@@ -0,0 +1,229 @@
+"""
+Server-side rendering of the Plotly charts, without plotly.graph_objects.
+
+Report imports this module on the first chart it renders, so that management
+commands, migrations and worker startup never pay for it.
+
+The figures are built as plain dicts, already in the normalized form that
+plotly's property validators would produce (e.g. title="T" becomes
+{"text": "T"}), and written out as the same div snippet as
+Figure.to_html(include_plotlyjs=False, full_html=False). This skips the
+validators, which dominate the cost of rendering small charts.
+"""
+import json
+import os
+import uuid
+from functools import lru_cache
+from importlib.util import find_spec
+
+try:
+	import orjson  # Plotly's own JSON engine when installed
+except ImportError:
+	orjson = None
+
+# The markup and whitespace of plotly.io.to_html(fig, include_plotlyjs=False, full_html=False)
+DIV_TEMPLATE = "".join([
+	"<div>", " " * 28,
+	'<div id="{id}" class="plotly-graph-div" style="height:{height}; width:{width};"></div>', " " * 12,
+	'<script type="text/javascript">', " " * 36,
+	"window.PLOTLYENV=window.PLOTLYENV || {{}};", " " * 36,
+	'if (document.getElementById("{id}")) {{', " " * 20,
+	"Plotly.newPlot(", " " * 24,
+	'"{id}",', " " * 24,
+	"{data},", " " * 24,
+	"{layout},", " " * 24,
+	"{config}", " " * 20,
+	")", " " * 16,
+	"}};", " " * 28,
+	"</script>", " " * 8,
+	"</div>",
+])
+
+@lru_cache(maxsize=None)
+def default_template():
+	"""
+	Return the default 'plotly' layout template, read once from plotly's package data.
+
+	The package is located without importing it, so plotly is never loaded.
+
+	Returns:
+		dict: The template, as in Figure.to_dict()["layout"]["template"].
+	"""
+	package = find_spec("plotly").submodule_search_locations[0]
+	with open(os.path.join(package, "package_data", "templates", "plotly.json"), encoding="utf-8") as template:
+		return json.load(template)
+
+def dumps(value):
+	"""
+	Serialize chart data to compact JSON, as plotly.io.to_json_plotly() would.
+
+	Args:
+		value (dict | list): Plain JSON-compatible data.
+
+	Returns:
+		str: The JSON text.
+	"""
+	if orjson is not None:
+		return orjson.dumps(value).decode("utf8")
+	return json.dumps(value, separators=(",", ":"))
+
+def _trace(trace_type, **properties):
+	"""
+	Return a trace dict with its properties in plotly's order: sorted, then the type.
+	"""
+	trace = {key: properties[key] for key in sorted(properties) if properties[key] is not None}
+	trace["type"] = trace_type
+	return trace
+
+def bar(x, y, name=None, color=None):
+	"""
+	Return a bar trace, like go.Bar(x=x, y=y, name=name, marker_color=color).
+	"""
+	return _trace("bar", x=list(x), y=list(y), name=name, marker=None if color is None else {"color": color})
+
+def scatter(x, y, mode=None, name=None):
+	"""
+	Return a scatter trace, like go.Scatter(x=x, y=y, mode=mode, name=name).
+	"""
+	return _trace("scatter", x=list(x), y=list(y), mode=mode, name=name)
+
+def pie(labels, values, colors=None):
+	"""
+	Return a pie trace, like go.Pie(labels=labels, values=values, marker=dict(colors=colors)).
+	"""
+	return _trace("pie", labels=list(labels), values=list(values), marker=None if colors is None else {"colors": list(colors)})
+
+def _title(value):
+	"""
+	Return a title in plotly's normalized form, {"text": value} for a plain string.
+	"""
+	return {"text": value} if isinstance(value, str) else value
+
+def layout(**properties):
+	"""
+	Return a layout dict with the default template.
+
+	Titles may be plain strings, for the layout and inside the axis dicts, as
+	with fig.update_layout(). The properties keep the given order, which is the
+	order they appear in the JSON.
+
+	Args:
+		**properties: The layout properties, e.g. title, xaxis, yaxis, height or barmode.
+
+	Returns:
+		dict: The layout.
+
+	Example:
+		layout(title="Streaks", xaxis={"title": "Habits"}, barmode="group")
+	"""
+	result = {"template": default_template()}
+
+	for key, value in properties.items():
+		if value is None:
+			continue
+		if key == "title":
+			value = _title(value)
+		elif key in ("xaxis", "yaxis") and "title" in value:
+			value = {**value, "title": _title(value["title"])}
+		result[key] = value
+	return result
+
+def to_html(data, layout, div_id=None):
+	"""
+	Render a figure as the div snippet of Figure.to_html(include_plotlyjs=False, full_html=False).
+
+	Args:
+		data (list[dict]): The traces.
+		layout (dict): The layout, see layout().
+		div_id (str, optional): The id of the chart div. Defaults to a UUID.
+
+	Returns:
+		str: The HTML representation of the chart.
+	"""
+	height = layout.get("height", layout["template"].get("layout", {}).get("height"))
+	width = layout.get("width", layout["template"].get("layout", {}).get("width"))
+
+	return DIV_TEMPLATE.format(
+		id=div_id or str(uuid.uuid4()),
+		height="100%" if height is None else f"{height}px",
+		width="100%" if width is None else f"{width}px",
+		data=dumps(data),
+		layout=dumps(layout),
+		config=json.dumps({"responsive": True}),
+	)
+
+def completion_chart(x, y, habit_name, habit_occurrence):
+	"""
+	Render a habit's completion history as a bar chart.
+
+	Args:
+		x (list[str]): The period labels.
+		y (list[int]): The completions per period.
+		habit_name (str): The name of the habit.
+		habit_occurrence (str): One of 'daily', 'weekly', 'monthly'.
+
+	Returns:
+		str: The HTML representation of the chart.
+	"""
+	title = f"Completion History for {habit_name}"
+
+	# Update layout based on occurrence
+	if habit_occurrence in ["daily", "weekly", "monthly"]:
+		chart_layout = layout(
+			yaxis={"title": "Completions", "tickvals": [1], "ticktext": ["✔"]}, title=title, xaxis={"title": "Period"}, height=300
+		)
+	else:
+		chart_layout = layout(title=title, xaxis={"title": "Period"}, yaxis={}, height=300)  # Reset, as yaxis=None did
+
+	return to_html([bar(x, y, color="blue")], chart_layout)
+
+def completion_trend_chart(data):
+	"""
+	Render the completion trend as a line chart.
+
+	Args:
+		data (dict): See Report.completion_trend_data().
+
+	Returns:
+		str: The HTML representation of the chart.
+	"""
+	trace = scatter(data["x"], data["y"], mode="lines+markers", name="Completions")
+	chart_layout = layout(
+		title="Habit Completion Trends", xaxis={"title": data["bucket"].capitalize()}, yaxis={"title": "Completions"}
+	)
+	return to_html([trace], chart_layout)
+
+def status_chart(data):
+	"""
+	Render the habit status breakdown as a pie chart.
+
+	Args:
+		data (dict): See Report.status_data().
+
+	Returns:
+		str: The HTML representation of the chart.
+	"""
+	trace = pie(data["labels"], data["values"], colors=["#4CAF50", "#FFC107", "#F44336"])
+	return to_html([trace], layout(title="Habit Status Breakdown"))
+
+def streak_chart(data):
+	"""
+	Render the best and current streaks of the top habits as a grouped bar chart.
+
+	Args:
+		data (dict): See Report.streak_data().
+
+	Returns:
+		str: The HTML representation of the chart.
+	"""
+	traces = [
+		bar(data["habits"], data["best"], name="Best Streak", color="#007BFF"),
+		bar(data["habits"], data["current"], name="Current Streak", color="#34A853"),
+	]
+	chart_layout = layout(
+		title="Habit Streak Trends",
+		xaxis={"title": "Habits"},
+		yaxis={"title": "Number of Days"},
+		barmode="group"
+	)
+	return to_html(traces, chart_layout)
@@ -0,0 +1,116 @@
+"""
+Cached top-K streak leaderboards, maintained incrementally as habits change.
+
+Every scope (all habits, one occurrence or one status) keeps its top
+HABITS_LEADERBOARD_SIZE habits by best streak in the cache, so a read costs one
+cache lookup whatever the number of habits. A saved habit is moved within the
+cached lists instead of invalidating them (see signals.py). Only when a habit
+drops off a full list, so that the next one is unknown, is the list reloaded
+from the habit indexes. Bulk writes that bypass the signals call
+invalidate_leaderboards() instead.
+"""
+from bisect import insort
+from copy import copy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Habit
+
+LEADERBOARD_KEY = "habits:leaderboard"
+
+# Leaderboard scopes: "all", "occurrence:<occurrence>" and "status:<status>"
+SCOPES = [
+	"all",
+	*(f"occurrence:{occurrence}" for occurrence, _ in Habit.OCCURENCE_CHOICES),
+	*(f"status:{status}" for status, _ in Habit.STATUS_CHOICES),
+]
+
+def leaderboard_size():
+	"""
+	Return the number of habits kept per leaderboard.
+	"""
+	return getattr(settings, "HABITS_LEADERBOARD_SIZE", 10)
+
+def habit_scopes(habit):
+	"""
+	Return the leaderboard scopes a habit belongs to.
+	"""
+	return ["all", f"occurrence:{habit.habit_occurrence}", f"status:{habit.habit_status}"]
+
+def _rank(habit):
+	"""
+	Return the sort key of a habit on a leaderboard: best streak first, then the oldest habit.
+	"""
+	return (-habit.habit_best_streak, habit.habit_id)
+
+def _key(scope):
+	return f"{LEADERBOARD_KEY}:{scope}"
+
+def leaderboard(scope="all"):
+	"""
+	Return the habits with the best streaks in a scope, from the cache or else one indexed query.
+
+	Args:
+		scope (str): One of SCOPES.
+
+	Returns:
+		tuple[Habit, ...]: At most leaderboard_size() habits, best streak first.
+	"""
+	habits = cache.get(_key(scope))
+	if habits is None:
+		queryset = Habit.objects.all()
+		if scope != "all":
+			field, value = scope.split(":", 1)
+			queryset = queryset.filter(**{f"habit_{field}": value})
+
+		habits = tuple(queryset.order_by("-habit_best_streak", "habit_id")[:leaderboard_size()])
+		cache.set(_key(scope), habits, getattr(settings, "HABITS_CHART_CACHE_TIMEOUT", 60 * 60 * 24))
+	return habits
+
+def update_leaderboards(habit, deleted=False):
+	"""
+	Move a saved or deleted habit within the cached leaderboards, once the transaction commits.
+
+	Args:
+		habit (Habit): The habit.
+		deleted (bool): Whether the habit was deleted, so it leaves every leaderboard.
+	"""
+	entry = copy(habit)  # As saved, a deleted habit loses its ID before the transaction commits
+	scopes = [] if deleted else habit_scopes(entry)
+
+	def update():
+		size = leaderboard_size()
+		boards = cache.get_many([_key(scope) for scope in SCOPES])
+		changed, stale = {}, []
+
+		for scope in SCOPES:
+			old = boards.get(_key(scope))
+			if old is None:  # Not cached, nothing to maintain
+				continue
+
+			# A full list holds every habit ranked above its last entry
+			bound = _rank(old[-1]) if len(old) >= size else None
+			habits = [other for other in old if other.habit_id != entry.habit_id]
+
+			if scope in scopes and (bound is None or _rank(entry) <= bound):
+				insort(habits, entry, key=_rank)
+				changed[_key(scope)] = tuple(habits[:size])
+			elif bound is not None and len(habits) < size:  # Left a full list, the next habit is unknown
+				stale.append(_key(scope))
+			elif len(habits) != len(old):
+				changed[_key(scope)] = tuple(habits)
+
+		if changed:
+			cache.set_many(changed, getattr(settings, "HABITS_CHART_CACHE_TIMEOUT", 60 * 60 * 24))
+		if stale:
+			cache.delete_many(stale)
+
+	transaction.on_commit(update)
+
+def invalidate_leaderboards():
+	"""
+	Drop the cached leaderboards after bulk writes, once the transaction commits.
+	"""
+	transaction.on_commit(lambda: cache.delete_many([_key(scope) for scope in SCOPES]))
@@ -0,0 +1,12 @@
+import time
+
+from django.core.management.base import BaseCommand
+from habits.models import CompletionRollup
+
+class Command(BaseCommand):
+  help = "Rebuild the completion rollup used by the analytics charts from the completions."
+
+  def handle(self, *args, **options):
+    started = time.monotonic()
+    rows = CompletionRollup.rebuild()
+    self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup row(s) in {time.monotonic() - started:.1f}s."))
@@ -0,0 +1,117 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from habits.batch import STREAK_FIELDS, apply_streaks, compute_streaks, store_runs
+from habits.chart_cache import bump_data_version
+from habits.leaderboard import invalidate_leaderboards
+from habits.models import Habit
+
+def _init_worker():
+  """
+  Sets up Django in a worker process and gives it its own database connections.
+  """
+  django.setup()
+  connections.close_all()
+
+class Command(BaseCommand):
+  help = "Recompute the stored streak runs and current and best streaks of all habits from their completions."
+
+  def add_arguments(self, parser):
+    parser.add_argument("--occurrence", choices=[c for c, _ in Habit.OCCURENCE_CHOICES], help="Only recompute habits with this occurrence.")
+    parser.add_argument("--status", choices=[s for s, _ in Habit.STATUS_CHOICES], help="Only recompute habits with this status.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Number of habits per chunk (default: 1000).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes; 1 computes in-process.")
+    parser.add_argument("--dry-run", action="store_true", help="Compute the streaks but do not save them.")
+
+  def handle(self, *args, **options):
+    habits = Habit.objects.all()
+    if options["status"]:
+      habits = habits.filter(habit_status=options["status"])
+
+    occurrences = [options["occurrence"]] if options["occurrence"] else [c for c, _ in Habit.OCCURENCE_CHOICES]
+    chunk_size = options["chunk_size"]
+    workers = max(1, options["workers"])
+    dry_run = options["dry_run"]
+
+    total = habits.filter(habit_occurrence__in=occurrences).count()
+    self.stdout.write(self.style.NOTICE(f"Recomputing streaks for {total} habit(s) with {workers} worker(s)..."))
+
+    started = time.monotonic()
+    done = changed = 0
+
+    pool = None
+    if workers > 1:
+      connections.close_all()  # Connections must not be shared with forked workers
+      pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    # Keep a bounded number of chunks in flight, so memory stays flat
+    pending = deque()
+
+    def store_oldest():
+      nonlocal done, changed
+      chunk, result = pending.popleft()
+      changed += self._store(chunk, result.result() if pool else result, dry_run)
+      done += len(chunk)
+      elapsed = time.monotonic() - started
+      self.stdout.write(f"  {done}/{total} habits ({done / elapsed if elapsed else 0:.0f} habits/s)")
+
+    try:
+      for occurrence in occurrences:
+        for chunk in self._chunks(habits.filter(habit_occurrence=occurrence), chunk_size):
+          ids = [habit.habit_id for habit in chunk]
+
+          if pool:
+            pending.append((chunk, pool.submit(compute_streaks, occurrence, ids)))
+          else:
+            pending.append((chunk, compute_streaks(occurrence, ids)))
+
+          while len(pending) > workers:
+            store_oldest()
+
+      while pending:
+        store_oldest()
+    finally:
+      if pool:
+        pool.shutdown(cancel_futures=True)
+
+    elapsed = time.monotonic() - started
+    verb = "would change" if dry_run else "changed"
+    self.stdout.write(self.style.SUCCESS(f"Recomputed {done} habit(s) in {elapsed:.1f}s, {verb} {changed}."))
+
+  def _chunks(self, habits, chunk_size):
+    """
+    Streams the habits in lists of at most chunk_size, without loading the table.
+    """
+    chunk = []
+    for habit in habits.only("habit_id", "habit_status", *STREAK_FIELDS).order_by("habit_id").iterator(chunk_size=chunk_size):
+      chunk.append(habit)
+      if len(chunk) == chunk_size:
+        yield chunk
+        chunk = []
+    if chunk:
+      yield chunk
+
+  def _store(self, chunk, result, dry_run):
+    """
+    Stores the streak runs of one chunk and saves the habits whose streaks changed.
+
+    Each chunk is written in its own short transaction so that SQLite's write
+    lock is never held for long.
+    """
+    before = {habit.habit_id: tuple(getattr(habit, f) for f in STREAK_FIELDS) for habit in chunk}
+    apply_streaks(chunk, result)
+    changed = [habit for habit in chunk if tuple(getattr(habit, f) for f in STREAK_FIELDS) != before[habit.habit_id]]
+
+    if not dry_run:
+      with transaction.atomic():
+        store_runs(list(before), result)  # The streak reads go through the runs, repair them too
+        if changed:
+          Habit.objects.bulk_update(changed, STREAK_FIELDS, batch_size=500)
+        bump_data_version()  # bulk_update() sends no signals
+        invalidate_leaderboards()
+    return len(changed)
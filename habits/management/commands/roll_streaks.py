@@ -0,0 +1,16 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from habits.models import Habit
+
+class Command(BaseCommand):
+  help = "Zero the stored current streaks that broke at the last period boundary. Run it after midnight, e.g. from cron."
+
+  def add_arguments(self, parser):
+    parser.add_argument("--date", type=date.fromisoformat, help="Roll the streaks as of this date (YYYY-MM-DD). Defaults to today.")
+
+  def handle(self, *args, **options):
+    started = time.monotonic()
+    rolled = Habit.roll_streaks(options["date"])
+    self.stdout.write(self.style.SUCCESS(f"Reset {rolled} broken streak(s) in {time.monotonic() - started:.1f}s."))
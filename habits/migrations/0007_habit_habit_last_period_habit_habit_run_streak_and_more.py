@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-17 00:35
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0006_alter_completion_completion_date"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="habit_last_period",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="habit",
+            name="habit_run_streak",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="completion",
+            name="completion_date",
+            field=models.DateTimeField(default=datetime.datetime.now),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.7 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+def backfill_completion_day(apps, schema_editor):
+    """
+    Store the day ordinal of every completion, then merge the live duplicates
+    of a day into the earliest completion of that day.
+    """
+    Completion = apps.get_model("habits", "Completion")
+
+    batch = []
+    for completion in Completion.objects.only("completion_id", "completion_date").iterator(chunk_size=2000):
+        completion.completion_day = completion.completion_date.toordinal()
+        batch.append(completion)
+        if len(batch) == 2000:
+            Completion.objects.bulk_update(batch, ["completion_day"])
+            batch = []
+    Completion.objects.bulk_update(batch, ["completion_day"])
+
+    duplicates = (
+        Completion.objects.filter(completion_deleted=False)
+        .values("completion_habit_id", "completion_day")
+        .annotate(count=models.Count("completion_id"), keep=models.Min("completion_id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        Completion.objects.filter(
+            completion_habit_id=duplicate["completion_habit_id"],
+            completion_day=duplicate["completion_day"],
+            completion_deleted=False,
+        ).exclude(completion_id=duplicate["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0007_habit_habit_last_period_habit_habit_run_streak_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="completion",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="completion",
+            name="completion_day",
+            field=models.IntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_completion_day, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="completion",
+            name="completion_day",
+            field=models.IntegerField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name="completion",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("completion_deleted", False)),
+                fields=("completion_habit_id", "completion_day"),
+                name="unique_live_completion_per_day",
+            ),
+        ),
+    ]
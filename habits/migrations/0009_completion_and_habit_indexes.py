@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-17 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0008_completion_completion_day"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="completion",
+            index=models.Index(
+                condition=models.Q(("completion_deleted", False)),
+                fields=["completion_habit_id", "completion_date"],
+                name="completion_live_habit_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["habit_status", "habit_occurrence"],
+                name="habit_status_occurrence_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["habit_occurrence"], name="habit_occurrence_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["habit_best_streak"], name="habit_best_streak_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.1.7 on 2026-10-17 00:46
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+
+def backfill_rollup(apps, schema_editor):
+    """
+    Aggregate the existing live completions into the rollup buckets.
+    """
+    Completion = apps.get_model("habits", "Completion")
+    CompletionRollup = apps.get_model("habits", "CompletionRollup")
+
+    truncs = {
+        "day": TruncDate("completion_date"),
+        "week": TruncWeek("completion_date", output_field=models.DateField()),
+        "month": TruncMonth("completion_date", output_field=models.DateField()),
+    }
+    for granularity, trunc in truncs.items():
+        buckets = (
+            Completion.objects.filter(completion_deleted=False)
+            .annotate(bucket=trunc)
+            .values("bucket", "completion_habit_id__habit_status")
+            .annotate(count=models.Count("completion_id"))
+            .order_by()
+        )
+        CompletionRollup.objects.bulk_create(
+            [
+                CompletionRollup(
+                    rollup_granularity=granularity,
+                    rollup_bucket_date=row["bucket"],
+                    rollup_habit_status=row["completion_habit_id__habit_status"],
+                    rollup_count=row["count"],
+                )
+                for row in buckets
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0009_completion_and_habit_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompletionRollup",
+            fields=[
+                ("rollup_id", models.AutoField(primary_key=True, serialize=False)),
+                ("rollup_bucket_date", models.DateField()),
+                (
+                    "rollup_granularity",
+                    models.CharField(
+                        choices=[("day", "Day"), ("week", "Week"), ("month", "Month")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "rollup_habit_status",
+                    models.CharField(
+                        choices=[
+                            ("active", "Active"),
+                            ("paused", "Paused"),
+                            ("inactive", "Inactive"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("rollup_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "rollup_granularity",
+                            "rollup_bucket_date",
+                            "rollup_habit_status",
+                        ),
+                        name="unique_completion_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-17 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0010_completionrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(fields=["habit_name"], name="habit_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["habit_status", "habit_name"], name="habit_status_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["habit_status", "habit_best_streak"],
+                name="habit_status_best_streak_idx",
+            ),
+        ),
+    ]
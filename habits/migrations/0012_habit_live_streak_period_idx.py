@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0011_habit_list_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                condition=models.Q(
+                    ("habit_last_streak__gt", 0), ("habit_status", "active")
+                ),
+                fields=["habit_occurrence", "habit_last_period"],
+                name="habit_live_streak_period_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:05
+
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copies of habits.streaks.day_period() and period_runs() as of this migration
+
+
+def day_period(occurrence, day):
+    if occurrence == "weekly":
+        return (day - 1) // 7
+    if occurrence == "monthly":
+        value = date.fromordinal(day)
+        return value.year * 12 + value.month - 1
+    return day
+
+
+def period_runs(periods):
+    runs = []
+    for period in periods:
+        if runs and period <= runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], max(runs[-1][1], period))
+        else:
+            runs.append((period, period))
+    return runs
+
+
+def backfill_runs(apps, schema_editor):
+    """
+    Split the existing live completions of every habit into streak runs.
+    """
+    Habit = apps.get_model("habits", "Habit")
+    Completion = apps.get_model("habits", "Completion")
+    StreakRun = apps.get_model("habits", "StreakRun")
+
+    for habit in Habit.objects.all().iterator():
+        days = (
+            Completion.objects.filter(completion_habit_id=habit, completion_deleted=False)
+            .order_by("completion_day")
+            .values_list("completion_day", flat=True)
+        )
+        runs = period_runs(day_period(habit.habit_occurrence, day) for day in days)
+        StreakRun.objects.bulk_create(
+            [
+                StreakRun(
+                    run_habit_id=habit,
+                    run_start_period=start,
+                    run_end_period=end,
+                    run_length=end - start + 1,
+                )
+                for start, end in runs
+            ],
+            batch_size=500,
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0012_habit_live_streak_period_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StreakRun",
+            fields=[
+                ("run_id", models.AutoField(primary_key=True, serialize=False)),
+                ("run_start_period", models.IntegerField()),
+                ("run_end_period", models.IntegerField()),
+                ("run_length", models.IntegerField()),
+                (
+                    "run_habit_id",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="streak_runs",
+                        to="habits.habit",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["run_habit_id", "run_end_period"],
+                        name="streak_run_habit_end_idx",
+                    ),
+                    models.Index(fields=["run_length"], name="streak_run_length_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("run_habit_id", "run_start_period"),
+                        name="unique_streak_run_start",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_runs, migrations.RunPython.noop),
+    ]
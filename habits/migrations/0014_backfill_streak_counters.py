@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+# Frozen copies of habits.streaks.cutoff_period() and live_streak() as of this migration
+
+
+def cutoff_period(occurrence):
+    if occurrence != "daily":
+        return None
+    return datetime.now().date().toordinal()
+
+
+def live_streak(last_period, run, cutoff):
+    if last_period is None:
+        return 0
+    if cutoff is not None and last_period < cutoff - 1:
+        return 0
+    return run
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Fill in the running streak counters of habits created before they existed, from their streak runs.
+
+    Follows StreakRun.state(): periods after the cutoff do not count, so a run
+    crossing it is cut short. Paused habits keep their last streak and inactive
+    habits are reset to 0.
+    """
+    Habit = apps.get_model("habits", "Habit")
+    StreakRun = apps.get_model("habits", "StreakRun")
+    fields = ["habit_last_period", "habit_run_streak", "habit_best_streak", "habit_last_streak"]
+
+    # Page through the habits by ID rather than with iterator(): SQLite gives no isolation
+    # between an open SELECT and the UPDATEs of the same table on one connection
+    pending = Habit.objects.filter(habit_last_period__isnull=True).order_by("habit_id")
+    last_id = 0
+    while habits := list(pending.filter(habit_id__gt=last_id)[:BATCH_SIZE]):
+        for habit in habits:
+            cutoff = cutoff_period(habit.habit_occurrence)
+            runs = StreakRun.objects.filter(run_habit_id=habit)
+            if cutoff is not None:
+                runs = runs.filter(run_start_period__lte=cutoff)
+
+            last_period, run, best = None, 0, 0
+            for start, end in runs.order_by("run_start_period").values_list("run_start_period", "run_end_period"):
+                last_period = end if cutoff is None else min(end, cutoff)
+                run = last_period - start + 1
+                best = max(best, run)
+
+            habit.habit_last_period, habit.habit_run_streak, habit.habit_best_streak = last_period, run, best
+            if habit.habit_status == "active":
+                habit.habit_last_streak = live_streak(last_period, run, cutoff)
+            elif habit.habit_status == "inactive":
+                habit.habit_last_streak = 0
+
+        Habit.objects.bulk_update(habits, fields, batch_size=BATCH_SIZE)
+        last_id = habits[-1].habit_id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0013_streakrun"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
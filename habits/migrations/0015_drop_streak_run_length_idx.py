@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:38
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0014_backfill_streak_counters"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="streakrun",
+            name="streak_run_length_idx",
+        ),
+    ]
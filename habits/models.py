@@ -1,10 +1,19 @@
-
-
-from django.db import models
-from django.db.models import Max
-import plotly.graph_objects as go
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, Max, Min, Q, Sum, When, Window
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
 from collections import Counter
-from datetime import timedelta, datetime
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from .chart_cache import bump_data_version
+from .streak_cache import cached_streak, peek_cached_streak
+from .streaks import (
+	period_ordinal, period_start, period_days, period_runs, day_period, cutoff_period, extend_run, live_streak,
+	scan_streak_series, StreakState,
+)
+
+# Streaks that went stale since they were stored, keyed by habit ID, waiting for
+# Habit.flush_pending_streaks(): (habit_last_period, habit_run_streak, streak)
+_pending_streaks = {}
 
 class Habit(models.Model):
 	"""
@@ -19,14 +28,22 @@ class Habit(models.Model):
 		habit_best_streak (IntegerField): The longest streak of consecutive completions.
 		habit_status (CharField): The current status of the habit (Active, Paused, Inactive).
 		habit_last_streak (IntegerField): The most recent streak of consecutive completions.
+		habit_last_period (IntegerField): The period ordinal of the latest completion (optional).
+		habit_run_streak (IntegerField): The length of the run ending at habit_last_period.
 
 	Methods:
 		__str__() -> str: Returns a string representation of the habit.
-		_calculate_daily_streak(completions, today) -> int: Calculate the current streak for a daily habit.
-		_calculate_monthly_streak(completions) -> int: Calculate the current streak for a monthly habit.
-		_calculate_weekly_streak(completions) -> int: Calculate the current streak for a weekly habit.
-		_update_streaks(streak) -> None: Update the habit's last and best streaks.
+		save() -> None: Saves the habit, rebuilding its streak runs and moving its rollup counts if needed.
+		counted_status() -> str: The status the habit's completions are counted under in the rollup.
+		get_best_streak() -> int: Return the longest streak run.
 		get_current_streak() -> int: Calculate the current streak based on the habit's status and occurrence.
+		current_streak -> int: The current streak for display, cached until the next period boundary.
+		record_completion(completion_date) -> int: Update the streaks for a new completion in constant time.
+		rebuild_streaks() -> int: Recalculate the streak runs and counters from the completion history.
+		refresh_streaks() -> int: Recalculate the streak counters from the streak runs.
+		peek_current_streak() -> int: Read the current streak without queries or writes.
+		flush_pending_streaks() -> int: Store the stale streaks found by peek_current_streak().
+		roll_streaks(today) -> int: Zero the stored streaks broken since the last period boundary.
 	"""
 
 	habit_id = models.AutoField(primary_key=True)
@@ -58,6 +75,26 @@ class Habit(models.Model):
 		default="active"
 	) 
 	habit_last_streak = models.IntegerField(default=0)
+	habit_last_period = models.IntegerField(blank=True, null=True)  # Unknown until the first (re)build
+	habit_run_streak = models.IntegerField(default=0)
+
+	# Fields whose changes save() carries over to the streak runs and the rollup
+	TRACKED_FIELDS = ["habit_occurrence", "habit_status"]
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["habit_status", "habit_occurrence"], name="habit_status_occurrence_idx"),  # habit_list filters
+			models.Index(fields=["habit_occurrence"], name="habit_occurrence_idx"),
+			models.Index(fields=["habit_best_streak"], name="habit_best_streak_idx"),  # Streak sorting and charts
+			models.Index(fields=["habit_name"], name="habit_name_idx"),  # habit_list pages, see pagination.SORTS
+			models.Index(fields=["habit_status", "habit_name"], name="habit_status_name_idx"),
+			models.Index(fields=["habit_status", "habit_best_streak"], name="habit_status_best_streak_idx"),
+			models.Index(
+				fields=["habit_occurrence", "habit_last_period"],
+				condition=models.Q(habit_status="active", habit_last_streak__gt=0),
+				name="habit_live_streak_period_idx",  # roll_streaks(), only habits with a running streak
+			),
+		]
 
 	def __str__(self):
 		"""
@@ -65,233 +102,274 @@ class Habit(models.Model):
 		"""
 		return f"{self.habit_name} ({self.habit_occurrence})"
 
-	def _calculate_daily_streak(self, completions):
+	@classmethod
+	def from_db(cls, db, field_names, values):
+		"""
+		Remembers the stored occurrence and status of the loaded habit, see save().
 		"""
-		Calculate the current streak for a daily habit.
+		habit = super().from_db(db, field_names, values)
+		habit._stored_fields = {field: habit.__dict__.get(field) for field in cls.TRACKED_FIELDS}
+		return habit
 
-		Args:
-			completions (QuerySet): The list of completions for the habit. 
+	def save(self, *args, **kwargs):
+		"""
+		Saves the habit, rebuilds its streak runs when the occurrence changed, since
+		the period ordinals change with it, and moves its completions to the new
+		status in the rollup when the status changed.
+		"""
+		update_fields = kwargs.get("update_fields")
+		written = [field for field in self.TRACKED_FIELDS if update_fields is None or field in update_fields]
+		stored = getattr(self, "_stored_fields", {})
+		changed = {field: stored[field] for field in written if stored.get(field) not in (None, getattr(self, field))}
+
+		if not changed:
+			super().save(*args, **kwargs)
+		else:
+			with transaction.atomic():
+				super().save(*args, **kwargs)
+				if "habit_occurrence" in changed:
+					StreakRun.rebuild(self)
+				if "habit_status" in changed:
+					CompletionRollup.move_habit(self, changed["habit_status"], self.habit_status)
+		self._stored_fields = {**stored, **{field: getattr(self, field) for field in written}}
+
+	def counted_status(self):
+		"""
+		Returns the status the habit's completions are counted under in the rollup, the last saved one.
+		"""
+		return getattr(self, "_stored_fields", {}).get("habit_status") or self.habit_status
+
+	def get_best_streak(self):
+		"""
+		Return the best streak, the length of the habit's longest run in StreakRun.
+
+		Uses a single gaps-and-islands query over the completions when
+		HABITS_STREAK_BACKEND is 'sql'.
 
 		Returns:
-			int: The current streak count.
+			int: The best streak ever.
+		"""
+		from .streak_sql import sql_streaks, streak_backend
+
+		if streak_backend() == "sql":
+			return sql_streaks(self.habit_id).get(self.habit_id, (0, 0))[1]
+		return StreakRun.state(self, cutoff_period(self.habit_occurrence)).best
+
+	def get_current_streak(self):
 		"""
-		# Get the last completion date
-		today = datetime.now().date()
+		Calculates the current streak based on the habit's status and occurrence:
 
-		 # Only consider completions in the past or today, and not soft-deleted
-		valid_dates = (
-			[c.completion_date.date() 
-			for c in completions 
-			if not c.completion_deleted and c.completion_date.date() <= today])
+		- If habit is inactive, return 0.
+		- If habit is paused, return the last streak before pausing.
+		- If habit is active, calculate streak using the occurrence cycle:
+			- daily: at midnight
+			- weekly: at the ISO week start (Monday)
+			- monthly: at the 1st of each month
 
-		streak = 0
+		The result is cached until the next period boundary or data change, see
+		streak_cache.py, so only the first call in a period scans the completions.
 
-		if today not in valid_dates:  # No completion today
-			current = today - timedelta(days=1) # Start from yesterday
-		else:
-			current = today  # Start from today
+		Returns:
+			int: The current streak count.
+		"""
+		return cached_streak(self, self._compute_current_streak)
 
-		while current in valid_dates:  # Count backwards
-			streak += 1
-			current -= timedelta(days=1)
-		
-		self._update_streaks(streak)
-		return streak  
+	def _compute_current_streak(self):
+		"""
+		Computes the current streak for get_current_streak(), bypassing the cache.
+		"""
+		if self.habit_status == "inactive":  # Habit is not being tracked
+			if self.habit_last_streak:
+				self.habit_last_streak = 0
+				self.save(update_fields=["habit_last_streak"])
+			return 0
 
-	def _calculate_monthly_streak(self, completions):
+		if self.habit_status == "paused":  # Habit is paused
+			return self.habit_last_streak
+
+		return self.refresh_streaks()
+
+	def record_completion(self, completion_date):
 		"""
-		Calculates monthly streak (one completion per calendar month).
+		Updates the streaks for a new (or restored) completion in constant time.
+
+		The habit keeps the period of its latest completion and the length of the
+		run ending there, so a completion in the same or a later period only has to
+		extend or restart that run. Backdated completions, and habits whose running
+		counters are not known yet, are read from the habit's streak runs instead.
 
 		Args:
-			completions (QuerySet): The list of completions for the habit.
+			completion_date (datetime): The date of the completion.
 
 		Returns:
 			int: The current streak count.
 		"""
-		if not completions:
-			return 0
+		if self.habit_last_period is None:
+			return self.refresh_streaks()
 
-		# Get all completion months
-		months = []
-		for c in completions:
-			months.append((c.completion_date.year, c.completion_date.month))
+		period = period_ordinal(self.habit_occurrence, completion_date)
+		run = extend_run(self.habit_last_period, self.habit_run_streak, period)
 
-		# Remove duplicate completions in same month
-		unique_months = list(dict.fromkeys(months))
-		streak = 1
+		if run is None:  # Backdated completion
+			return self.refresh_streaks()
 
-		for i in range(1, len(unique_months)):  # Start from 2nd completion
-			prev_year, prev_month = unique_months[i - 1]  # Previous completion
-			curr_year, curr_month = unique_months[i]  # Current completion
+		self.habit_last_period = max(self.habit_last_period, period)
+		self.habit_run_streak = run
+		self.habit_best_streak = max(self.habit_best_streak, run)
 
-			# Check if month is consecutive
-			if (curr_year == prev_year and curr_month == prev_month + 1) or \
-			(curr_year == prev_year + 1 and prev_month == 12 and curr_month == 1):
-				streak += 1
-			else:
-				streak = 1  # streak broken
+		if self.habit_status == "active":
+			cutoff = cutoff_period(self.habit_occurrence)
+			self.habit_last_streak = live_streak(self.habit_last_period, run, cutoff)
+		elif self.habit_status == "inactive":
+			self.habit_last_streak = 0
 
-		self._update_streaks(streak)
-		return streak
+		self.save(update_fields=["habit_last_period", "habit_run_streak", "habit_last_streak", "habit_best_streak"])
+		return self.habit_last_streak
 
-	def get_best_streak(self):
+	def rebuild_streaks(self):
 		"""
-		Recalculate and return the best streak based on all completions.
+		Recalculates the streak runs, running counters and streaks from the full completion history.
+
+		Only needed when the occurrence changes, since the period ordinals change
+		with it, or to repair the runs after changes that bypassed Completion.save().
+		Paused habits keep their last streak and inactive habits are reset to 0.
 
 		Returns:
-			int: The best streak ever.
+			int: The current streak count.
 		"""
-		completions = self.completions.filter(completion_deleted=False).order_by("completion_date")
+		StreakRun.rebuild(self)
+		return self.refresh_streaks()
 
-		if not completions:
-			return 0
+	def refresh_streaks(self):
+		"""
+		Recalculates the running counters and streaks from the habit's streak runs,
+		e.g. after a completion was backdated or deleted, without reading the completions.
 
-		if self.habit_occurrence == "daily":
-			dates = sorted([c.completion_date.date() for c in completions if not c.completion_deleted ])  # Sort by date, excluded the deleted completions
-			best = streak = 1
-
-			for i in range(1, len(dates)):
-				if dates[i] == dates[i - 1] + timedelta(days=1):  # Check for consecutive days
-					streak += 1
-					best = max(best, streak)  # Update best streak
-				else:
-					streak = 1
-			return best
-
-		elif self.habit_occurrence == "weekly":
-			weeks = [(c.completion_date.isocalendar()[:2]) for c in completions if not c.completion_deleted]	# sort by week, excluded the deleted completions
-			unique_weeks = list(dict.fromkeys(weeks))  # Remove duplicates
-			best = streak = 1
-
-			for i in range(1, len(unique_weeks)):  # Start from 2nd completion
-				prev_year, prev_week = unique_weeks[i - 1]
-				curr_year, curr_week = unique_weeks[i]
-				
-				# Check if week is consecutive
-				is_consecutive = (
-					(curr_year == prev_year and curr_week == prev_week + 1) or
-					(curr_year == prev_year + 1 and prev_week == 52 and curr_week == 1)
-				)
+		Paused habits keep their last streak and inactive habits are reset to 0.
 
-				if is_consecutive:
-					streak += 1
-					best = max(best, streak)
-				else:
-					streak = 1
-			return best
-
-		elif self.habit_occurrence == "monthly":
-			months = [(c.completion_date.year, c.completion_date.month) for c in completions if not c.completion_deleted] # sort by month, excluded the deleted completions
-			unique_months = list(dict.fromkeys(months))
-			best = streak = 1
-
-			for i in range(1, len(unique_months)):  # Start from 2nd completion
-				prev_y, prev_m = unique_months[i - 1]
-				curr_y, curr_m = unique_months[i]
-
-				# Check if month is consecutive
-				is_consecutive = (
-					(curr_y == prev_y and curr_m == prev_m + 1) or
-					(curr_y == prev_y + 1 and prev_m == 12 and curr_m == 1)
-				)
+		Returns:
+			int: The current streak count.
+		"""
+		state = StreakRun.state(self, cutoff_period(self.habit_occurrence))
+		fields = ["habit_last_period", "habit_run_streak", "habit_last_streak", "habit_best_streak"]
+		before = [getattr(self, field) for field in fields]
+
+		self.habit_last_period = state.last_period
+		self.habit_run_streak = state.run
+		self.habit_best_streak = state.best
 
-				if is_consecutive:
-					streak += 1
-					best = max(best, streak)
-				else:
-					streak = 1
-			return best
+		if self.habit_status == "active":
+			self.habit_last_streak = state.current
+		elif self.habit_status == "inactive":
+			self.habit_last_streak = 0
 
-		return 0
+		if [getattr(self, field) for field in fields] != before:  # Unchanged streaks keep the cached charts
+			self.save(update_fields=fields)
+		return self.habit_last_streak
 
-	def _calculate_weekly_streak(self, completions):
+	def peek_current_streak(self, today=None):
 		"""
-		Calculates current streak of weekly completions starting on Mondays.
+		Returns the current streak from the stored running counters, without
+		querying or writing to the database, for read-only paths such as charts.
+
+		If the stored habit_last_streak has gone stale (e.g. a daily streak broke
+		at midnight), the fresh value is queued for flush_pending_streaks() rather
+		than saved here, so that GET requests never take the database write lock.
 
 		Args:
-			completions (QuerySet): The list of completions for the habit.
+			today (date, optional): The reference date. Defaults to today.
 
 		Returns:
 			int: The current streak count.
 		"""
-		if not completions:
+		if self.habit_status == "inactive":
 			return 0
 
-		streak = 1
-		weeks = sorted([c.completion_date.isocalendar()[:2] for c in completions if not c.completion_deleted])  # sort by week, excluded the deleted completions
-
-		for i in range(len(weeks) - 1):
-			year1, week1 = weeks[i]
-			year2, week2 = weeks[i + 1]
+		# Paused habits keep their streak, and unknown counters fall back to the stored streak
+		if self.habit_status == "paused" or self.habit_last_period is None:
+			return self.habit_last_streak
 
-			# Check for consecutive ISO weeks
-			if (year2 == year1 and week2 == week1 + 1) or (year2 == year1 + 1 and week1 == 52 and week2 == 1):
-				streak += 1
-			else:
-				streak = 1
+		cutoff = cutoff_period(self.habit_occurrence, today)
+		streak = live_streak(self.habit_last_period, self.habit_run_streak, cutoff)
 
-		self._update_streaks(streak)
+		if streak != self.habit_last_streak:
+			_pending_streaks[self.habit_id] = (self.habit_last_period, self.habit_run_streak, streak)
 		return streak
 
-	def _update_streaks(self, current_streak):
+	@property
+	def current_streak(self):
 		"""
-		Update the habit's last streak and best streak by recalculation.
+		The current streak for display, from the streak cache or else the stored
+		running counters, see peek_current_streak(). Never queries the database,
+		and never fills the cache, which only holds get_current_streak() results.
 
-		Args:
-			current_streak (int): The latest streak based on current completions.
-
-		Updates:
-			habit_last_streak (int): The latest streak.
-			habit_best_streak (int): The best streak.
+		Returns:
+			int: The current streak count.
 		"""
-		self.habit_last_streak = current_streak
-		self.habit_best_streak = self.get_best_streak()
-		self.save(update_fields=["habit_last_streak", "habit_best_streak"])
-
+		streak = peek_cached_streak(self)
+		return self.peek_current_streak() if streak is None else streak
 
-	def get_current_streak(self):
+	@staticmethod
+	def roll_streaks(today=None):
 		"""
-		Calculates the current streak based on the habit's status and occurrence:
+		Zeroes the current streak of every active habit whose previous period went uncompleted.
 
-		- If habit is inactive, return 0.
-		- If habit is paused, return the last streak before pausing.
-		- If habit is active, calculate streak using the occurrence cycle:
-			- daily: at midnight
-			- weekly: at the ISO week start (Monday)
-			- monthly: at the 1st of each month
+		Meant to run after each period boundary (e.g. nightly from cron), so that the
+		stored habit_last_streak stays correct without recomputing it per request.
+		Only daily streaks lapse with the calendar, see cutoff_period(). The broken
+		streaks are found with the partial habit_live_streak_period_idx index and
+		reset in one UPDATE, so the cost grows with the number of broken streaks
+		rather than with the number of habits.
+
+		Args:
+			today (date, optional): The reference date. Defaults to today.
 
 		Returns:
-			int: The current streak count.
+			int: The number of habits whose streak was reset.
 		"""
-		if self.habit_status == "inactive":  # Habit is not being tracked
-			self.habit_last_streak = 0
-			self.save(update_fields=["habit_last_streak"])
-			return 0
+		updated = 0
+		for occurrence, _ in Habit.OCCURENCE_CHOICES:
+			cutoff = cutoff_period(occurrence, today)
+			if cutoff is None:  # Never lapses
+				continue
 
-		if self.habit_status == "paused":  # Habit is paused
-			return self.habit_last_streak
+			updated += Habit.objects.filter(
+				habit_occurrence=occurrence, habit_status="active", habit_last_streak__gt=0, habit_last_period__lt=cutoff - 1
+			).update(habit_last_streak=0)
 
-		completions = list(
-			self.completions.filter(completion_deleted=False).order_by("completion_date")
-		)
+		if updated:  # Queryset updates send no signals
+			from .leaderboard import invalidate_leaderboards
 
-		# Calculate streak based on occurrence
-		if self.habit_occurrence == "daily":
-			streak = self._calculate_daily_streak(completions)
-		elif self.habit_occurrence == "weekly":
-			streak = self._calculate_weekly_streak(completions)
-		elif self.habit_occurrence == "monthly":
-			streak = self._calculate_monthly_streak(completions)
-		else:
-			streak = 0
+			bump_data_version()
+			invalidate_leaderboards()
+		return updated
 
-		# Update best streak if current streak is higher
-		if streak > self.habit_best_streak:
-			self.habit_best_streak = streak
+	@staticmethod
+	def flush_pending_streaks():
+		"""
+		Stores the stale streaks queued by peek_current_streak(), in one transaction.
 
-		self.habit_last_streak = streak
-		self.save(update_fields=["habit_last_streak", "habit_best_streak"])
-		return streak
+		A queued value is only written if the habit's running counters are still
+		the ones it was computed from, so a completion recorded in the meantime is
+		never overwritten.
+
+		Returns:
+			int: The number of habits updated.
+		"""
+		updated = 0
+		with transaction.atomic():
+			while _pending_streaks:
+				habit_id, (last_period, run, streak) = _pending_streaks.popitem()
+				updated += Habit.objects.filter(
+					habit_id=habit_id, habit_status="active", habit_last_period=last_period, habit_run_streak=run
+				).update(habit_last_streak=streak)
+
+		if updated:  # Queryset updates send no signals
+			from .leaderboard import invalidate_leaderboards
+
+			bump_data_version()
+			invalidate_leaderboards()
+		return updated
 
 class Completion(models.Model):
 	"""
@@ -302,21 +380,38 @@ class Completion(models.Model):
 			completion_habit_id (ForeignKey): Links the completion to a specific Habit.
 			completion_date (DateTimeField): The date the habit was completed.
 			completion_deleted (BooleanField): Tracks if the completion was deleted.
+			completion_day (IntegerField): The day ordinal of completion_date, set on save.
 	
 	Constraints:
-			- unique_together ensures a habit cannot be completed more than once on the same day.
+			- unique_live_completion_per_day ensures a habit cannot be completed more than once on the same day
+			  (soft-deleted completions are not counted).
 
 	Methods:
 			__str__() -> str: Returns a string representation of the completion.
+			save() -> None: Stores the day ordinal of the completion date and updates the streak runs and the rollup.
 	"""
 
 	completion_id = models.AutoField(primary_key=True)
 	completion_habit_id = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="completions")
 	completion_date = models.DateTimeField(default=datetime.now)  # Default to now
 	completion_deleted = models.BooleanField(default=False)  # Track if completion was deleted
+	completion_day = models.IntegerField(editable=False)  # Day ordinal, see streaks.period_ordinal()
 
 	class Meta:
-			unique_together = ("completion_habit_id", "completion_date")  # Prevents duplicate completions for the same day
+			constraints = [
+				models.UniqueConstraint(
+					fields=["completion_habit_id", "completion_day"],
+					condition=models.Q(completion_deleted=False),
+					name="unique_live_completion_per_day",  # Prevents duplicate completions for the same day
+				),
+			]
+			indexes = [
+				models.Index(
+					fields=["completion_habit_id", "completion_date"],
+					condition=models.Q(completion_deleted=False),
+					name="completion_live_habit_date_idx",  # A habit's completions in date order
+				),
+			]
 
 	def __str__(self):
 			"""
@@ -324,26 +419,559 @@ class Completion(models.Model):
 			"""
 			return f"{self.completion_habit_id.habit_name} completed on {self.completion_date}"
 
+	@classmethod
+	def from_db(cls, db, field_names, values):
+			"""
+			Remembers which day the loaded completion counts for, see save().
+			"""
+			completion = super().from_db(db, field_names, values)
+			if "completion_deleted" in completion.__dict__ and "completion_day" in completion.__dict__:
+				completion._stored_day = completion._live_day()
+			return completion
+
+	def _live_day(self):
+			"""
+			Returns the day ordinal the completion counts for, or None if it is deleted.
+			"""
+			return None if self.completion_deleted else self.completion_day
+
+	def save(self, *args, **kwargs):
+			"""
+			Stores the day ordinal of the completion date before saving, and updates
+			the habit's streak runs and the rollup when the completion is added,
+			deleted, restored or moved to another day.
+			"""
+			update_fields = kwargs.get("update_fields")
+			self.completion_day = period_ordinal("daily", self.completion_date)
+			if update_fields is not None:
+				kwargs["update_fields"] = {*update_fields, "completion_day"}
+				if not {"completion_date", "completion_deleted"} & set(update_fields):  # The counted day is unchanged
+					super().save(*args, **kwargs)
+					return
+
+			if not hasattr(self, "_stored_day") and not self._state.adding:  # Loaded with deferred fields, see from_db()
+				row = Completion.objects.filter(pk=self.pk).values_list("completion_deleted", "completion_day").first()
+				self._stored_day = None if row is None or row[0] else row[1]
+
+			stored, live = getattr(self, "_stored_day", None), self._live_day()
+			if stored == live:
+				super().save(*args, **kwargs)
+			else:
+				habit = self.completion_habit_id
+				with transaction.atomic():
+					super().save(*args, **kwargs)
+					if stored is not None:
+						StreakRun.discard(habit, stored)
+						CompletionRollup.record(habit.counted_status(), [stored], -1)
+					if live is not None:
+						StreakRun.record(habit, live)
+						CompletionRollup.record(habit.counted_status(), [live])
+			self._stored_day = live
+
+class StreakRun(models.Model):
+	"""
+	A run of consecutive completed periods of a habit, its streak history.
+
+	The runs are kept up to date by Completion.save() as completions are added,
+	soft-deleted or restored: a new period extends, merges or starts runs and a
+	removed period shortens or splits the run containing it, touching at most
+	two rows, and hard deletes are handled in signals.py. Queryset updates and
+	bulk creates bypass both, use record() and discard() there or rebuild()
+	afterwards.
+
+	Attributes:
+		run_id (AutoField): Primary key for StreakRun.
+		run_habit_id (ForeignKey): The habit the run belongs to.
+		run_start_period (IntegerField): The first period of the run, see streaks.period_ordinal().
+		run_end_period (IntegerField): The last period of the run.
+		run_length (IntegerField): The number of periods in the run.
+
+	Constraints:
+		- unique_streak_run_start ensures runs of a habit never start in the same period.
+
+	Methods:
+		start_date -> date: The first day of the run.
+		end_date -> date: The last day of the run.
+		record(habit, day) -> None: Add a completed day to the habit's runs.
+		discard(habit, day) -> None: Remove a day that is no longer completed from the habit's runs.
+		state(habit, cutoff) -> StreakState: The habit's streak counters, read from its runs.
+		rebuild(habit) -> int: Recompute the runs of one or all habits from the completions.
+		store(habit_ids, runs) -> int: Replace the runs of the given habits.
+	"""
+
+	run_id = models.AutoField(primary_key=True)
+	run_habit_id = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name="streak_runs")
+	run_start_period = models.IntegerField()
+	run_end_period = models.IntegerField()
+	run_length = models.IntegerField()
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["run_habit_id", "run_start_period"], name="unique_streak_run_start"),
+		]
+		indexes = [
+			models.Index(fields=["run_habit_id", "run_end_period"], name="streak_run_habit_end_idx"),  # Latest runs first
+		]
+
+	def __str__(self):
+		"""
+		Returns a string representation of the run.
+		"""
+		return f"{self.run_length} period run of habit {self.run_habit_id_id} from {self.start_date} to {self.end_date}"
+
+	@property
+	def start_date(self):
+		"""
+		The first day of the run.
+		"""
+		return period_start(self.run_habit_id.habit_occurrence, self.run_start_period)
+
+	@property
+	def end_date(self):
+		"""
+		The last day of the run.
+		"""
+		return date.fromordinal(period_days(self.run_habit_id.habit_occurrence, self.run_end_period)[1])
+
+	@classmethod
+	def record(cls, habit, day):
+		"""
+		Adds a completed day to the habit's runs, extending or merging the adjacent runs.
+
+		Args:
+			habit (Habit): The habit.
+			day (int): The day ordinal of the completion.
+		"""
+		period = day_period(habit.habit_occurrence, day)
+		runs = cls.objects.filter(run_habit_id=habit)
+
+		with transaction.atomic():
+			if runs.filter(run_start_period__lte=period, run_end_period__gte=period).exists():  # Already completed
+				return
+
+			before = runs.filter(run_end_period=period - 1).first()
+			after = runs.filter(run_start_period=period + 1).first()
+
+			if before and after:  # Fills the gap between two runs
+				after.delete()
+				before.run_end_period = after.run_end_period
+				run = before
+			elif before:
+				before.run_end_period = period
+				run = before
+			elif after:
+				after.run_start_period = period
+				run = after
+			else:
+				run = cls(run_habit_id=habit, run_start_period=period, run_end_period=period)
+
+			run.run_length = run.run_end_period - run.run_start_period + 1
+			run.save()
+
+	@classmethod
+	def discard(cls, habit, day):
+		"""
+		Removes a day that is no longer completed from the habit's runs, shortening or splitting its run.
+
+		The period stays completed while other live completions fall in it.
+
+		Args:
+			habit (Habit): The habit.
+			day (int): The day ordinal of the deleted completion.
+		"""
+		period = day_period(habit.habit_occurrence, day)
+		first_day, last_day = period_days(habit.habit_occurrence, period)
+
+		with transaction.atomic():
+			if habit.habit_occurrence != "daily" and habit.completions.filter(
+				completion_deleted=False, completion_day__gte=first_day, completion_day__lte=last_day
+			).exists():
+				return
+
+			run = cls.objects.filter(
+				run_habit_id=habit, run_start_period__lte=period, run_end_period__gte=period
+			).first()
+			if run is None:
+				return
+
+			if run.run_start_period == run.run_end_period:
+				run.delete()
+				return
+
+			if run.run_start_period == period:
+				run.run_start_period = period + 1
+			elif run.run_end_period == period:
+				run.run_end_period = period - 1
+			else:  # Split, the rest of the run after the period becomes a run of its own
+				cls.objects.create(
+					run_habit_id=habit, run_start_period=period + 1, run_end_period=run.run_end_period,
+					run_length=run.run_end_period - period,
+				)
+				run.run_end_period = period - 1
+
+			run.run_length = run.run_end_period - run.run_start_period + 1
+			run.save()
+
+	@classmethod
+	def state(cls, habit, cutoff=None):
+		"""
+		Returns the streak counters of a habit from its runs, in one indexed query.
+
+		Follows the streak rules of cutoff_period() and live_streak(): periods
+		after the cutoff do not count, so a run crossing it is cut short. The
+		latest run is read together with the longest earlier one, through a
+		window over the habit's runs (SQLite 3.25+).
+
+		Args:
+			habit (Habit): The habit.
+			cutoff (int | None): The current period, see cutoff_period().
+
+		Returns:
+			StreakState: The current and best streak and the running counters.
+		"""
+		runs = cls.objects.filter(run_habit_id=habit)
+		if cutoff is not None:
+			runs = runs.filter(run_start_period__lte=cutoff)
+
+		# Only the latest run can cross the cutoff, so the others count in full
+		length = F("run_length") if cutoff is None else Case(When(run_end_period__lte=cutoff, then="run_length"), default=0)
+		latest = runs.annotate(best=Window(Max(length))).order_by("-run_end_period").first()
+		if latest is None:
+			return StreakState(0, 0, None, 0)
+
+		last_period = latest.run_end_period if cutoff is None else min(latest.run_end_period, cutoff)
+		run = last_period - latest.run_start_period + 1
+
+		return StreakState(live_streak(last_period, run, cutoff), max(latest.best, run), last_period, run)
+
+	@classmethod
+	def rebuild(cls, habit=None):
+		"""
+		Recomputes the runs of one habit, or of all habits, from their live completions.
+
+		Args:
+			habit (Habit, optional): The habit. Defaults to all habits.
+
+		Returns:
+			int: The number of runs stored.
+		"""
+		habits = Habit.objects.all() if habit is None else [habit]
+		stored = 0
+
+		with transaction.atomic():
+			for habit in habits:
+				days = habit.completions.filter(completion_deleted=False).order_by("completion_day").values_list(
+					"completion_day", flat=True
+				)
+				runs = period_runs(day_period(habit.habit_occurrence, day) for day in days)
+				stored += cls.store([habit.habit_id], ((habit.habit_id, start, end) for start, end in runs))
+		return stored
+
+	@classmethod
+	def store(cls, habit_ids, runs):
+		"""
+		Replaces the runs of the given habits, e.g. with runs computed in bulk (see batch.py).
+
+		Args:
+			habit_ids (list[int] | QuerySet): The habits, or a subquery selecting them.
+			runs (Iterable[tuple[int, int, int]]): The (habit ID, first period, last period) of each run.
+
+		Returns:
+			int: The number of runs stored.
+		"""
+		with transaction.atomic():
+			cls.objects.filter(run_habit_id__in=habit_ids).delete()
+			return len(cls.objects.bulk_create(
+				[
+					cls(run_habit_id_id=habit_id, run_start_period=start, run_end_period=end, run_length=end - start + 1)
+					for habit_id, start, end in runs
+				],
+				batch_size=500,
+			))
+
+class CompletionRollup(models.Model):
+	"""
+	Pre-aggregated completion counts per day, week and month, for the analytics charts.
+
+	The rollup is kept up to date like the streak runs: by Completion.save() as
+	completions are added, soft-deleted or restored, by Habit.save() as the
+	status changes (see move_habit()) and by the delete signals in signals.py.
+	Queryset updates and bulk creates bypass them, the rollup can then be
+	rebuilt from scratch with rebuild() or the rebuild_rollups management command.
+
+	Attributes:
+		rollup_id (AutoField): Primary key for CompletionRollup.
+		rollup_bucket_date (DateField): The first day of the bucket (the day, its Monday, or the 1st of the month).
+		rollup_granularity (CharField): The bucket size (Day, Week, Month).
+		rollup_habit_status (CharField): The status of the completed habits (Active, Paused, Inactive).
+		rollup_count (IntegerField): The number of live completions in the bucket.
+
+	Constraints:
+		- unique_completion_rollup_bucket ensures there is one row per bucket, granularity and status.
+
+	Methods:
+		bucket_dates(day) -> list: The (granularity, bucket date) of each bucket containing a day.
+		record(habit_status, days, delta) -> None: Add delta completions on each of the days.
+		move_habit(habit, old_status, new_status) -> None: Move a habit's completions to another status.
+		rebuild() -> int: Recompute the whole rollup from the completions.
+	"""
+
+	GRANULARITY_CHOICES = [
+		("day", "Day"),
+		("week", "Week"),
+		("month", "Month"),
+	]
+
+	rollup_id = models.AutoField(primary_key=True)
+	rollup_bucket_date = models.DateField()
+	rollup_granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+	rollup_habit_status = models.CharField(max_length=20, choices=Habit.STATUS_CHOICES)
+	rollup_count = models.IntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(
+				fields=["rollup_granularity", "rollup_bucket_date", "rollup_habit_status"],
+				name="unique_completion_rollup_bucket",
+			),
+		]
+
+	def __str__(self):
+		"""
+		Returns a string representation of the rollup bucket.
+		"""
+		return f"{self.rollup_count} {self.rollup_habit_status} completions in {self.rollup_granularity} of {self.rollup_bucket_date}"
+
+	@staticmethod
+	def bucket_dates(day):
+		"""
+		Returns the buckets containing a day, one per granularity.
+
+		Args:
+			day (int): The day ordinal, see Completion.completion_day.
+
+		Returns:
+			list[tuple[str, date]]: The (granularity, bucket date) pairs.
+		"""
+		value = date.fromordinal(day)
+		return [
+			("day", value),
+			("week", date.fromordinal(day - (day - 1) % 7)),  # Monday, as TruncWeek
+			("month", value.replace(day=1)),
+		]
+
+	@classmethod
+	def record(cls, habit_status, days, delta=1):
+		"""
+		Adds delta completions to the buckets of each day, with one UPDATE per bucket.
+
+		Args:
+			habit_status (str): The status of the completed habit.
+			days (Iterable[int]): The day ordinals of the completions.
+			delta (int): 1 for created or restored completions, -1 for deleted ones.
+		"""
+		counts = Counter(bucket for day in days for bucket in cls.bucket_dates(day))
+
+		with transaction.atomic():
+			for (granularity, bucket_date), count in counts.items():
+				cls._add(granularity, bucket_date, habit_status, count * delta)
+			bump_data_version()  # The trend chart reads the rollup
+
+	@classmethod
+	def _add(cls, granularity, bucket_date, habit_status, delta):
+		"""
+		Adds delta to one bucket, creating it if needed.
+		"""
+		bucket = cls.objects.filter(
+			rollup_granularity=granularity, rollup_bucket_date=bucket_date, rollup_habit_status=habit_status
+		)
+		if bucket.update(rollup_count=F("rollup_count") + delta):
+			return
+
+		try:
+			with transaction.atomic():
+				cls.objects.create(
+					rollup_granularity=granularity, rollup_bucket_date=bucket_date,
+					rollup_habit_status=habit_status, rollup_count=delta
+				)
+		except IntegrityError:  # Created concurrently by another request
+			bucket.update(rollup_count=F("rollup_count") + delta)
+
+	@classmethod
+	def move_habit(cls, habit, old_status, new_status):
+		"""
+		Moves the live completions of a habit from one status to another, e.g. when it is paused.
+
+		The habit's completions are counted per bucket in SQL and the buckets are
+		updated with a few set-based statements, so the number of queries does not
+		grow with the length of the habit's history.
+
+		Args:
+			habit (Habit): The habit whose status changed.
+			old_status (str): The status the completions are counted under.
+			new_status (str): The status to count them under, or None if the habit is deleted.
+		"""
+		if old_status == new_status:
+			return
+
+		counts = {
+			(granularity, row["bucket"]): row["count"]
+			for granularity, row in cls._bucket_counts(habit.completions.filter(completion_deleted=False))
+		}
+		if not counts:
+			return
+
+		with transaction.atomic():
+			cls._add_counts(counts, old_status, -1)
+			if new_status is not None:
+				cls._add_counts(counts, new_status, 1)
+			bump_data_version()  # The trend chart reads the rollup
+
+	@classmethod
+	def _add_counts(cls, counts, habit_status, sign):
+		"""
+		Adds sign times the count to each bucket of a status, creating the missing buckets first.
+
+		Args:
+			counts (dict[tuple[str, date], int]): The count per (granularity, bucket date).
+			habit_status (str): The status of the buckets.
+			sign (int): 1 to add the counts, -1 to remove them.
+		"""
+		if sign > 0:  # Removed counts are in existing buckets
+			cls.objects.bulk_create(
+				[
+					cls(rollup_granularity=granularity, rollup_bucket_date=bucket_date, rollup_habit_status=habit_status, rollup_count=0)
+					for granularity, bucket_date in counts
+				],
+				batch_size=500, ignore_conflicts=True,  # Existing or created concurrently
+			)
+
+		dates = [bucket_date for _, bucket_date in counts]
+		buckets = cls.objects.filter(
+			rollup_habit_status=habit_status, rollup_bucket_date__gte=min(dates), rollup_bucket_date__lte=max(dates)
+		).only("rollup_id", "rollup_granularity", "rollup_bucket_date")
+
+		changed = []
+		for bucket in buckets:
+			count = counts.get((bucket.rollup_granularity, bucket.rollup_bucket_date))
+			if count:
+				bucket.rollup_count = F("rollup_count") + sign * count  # Safe against concurrent updates
+				changed.append(bucket)
+		cls.objects.bulk_update(changed, ["rollup_count"], batch_size=500)
+
+	@staticmethod
+	def _bucket_counts(completions, *fields):
+		"""
+		Counts completions per bucket, with one GROUP BY per granularity.
+
+		Args:
+			completions (QuerySet): The completions to count.
+			*fields (str): More fields to group by.
+
+		Yields:
+			tuple[str, dict]: The granularity and a row with the bucket date, the fields and the count.
+		"""
+		truncs = {
+			"day": TruncDate("completion_date"),
+			"week": TruncWeek("completion_date", output_field=models.DateField()),
+			"month": TruncMonth("completion_date", output_field=models.DateField()),
+		}
+		for granularity, trunc in truncs.items():
+			rows = completions.annotate(bucket=trunc).values("bucket", *fields).annotate(count=Count("completion_id")).order_by()
+			for row in rows:
+				yield granularity, row
+
+	@classmethod
+	def rebuild(cls):
+		"""
+		Recomputes the whole rollup from the live completions, with one GROUP BY per granularity.
+
+		Returns:
+			int: The number of rollup rows stored.
+		"""
+		rows = [
+			cls(
+				rollup_granularity=granularity, rollup_bucket_date=row["bucket"],
+				rollup_habit_status=row["completion_habit_id__habit_status"], rollup_count=row["count"]
+			)
+			for granularity, row in cls._bucket_counts(
+				Completion.objects.filter(completion_deleted=False), "completion_habit_id__habit_status"
+			)
+		]
+
+		with transaction.atomic():
+			cls.objects.all().delete()
+			cls.objects.bulk_create(rows, batch_size=500)
+			bump_data_version()
+		return len(rows)
+
+@dataclass(frozen=True)
+class AnalyticsSnapshot:
+	"""
+	The counters shown on the analytics page, computed together by Report.snapshot().
+
+	Attributes:
+		active_habits (int): The number of active habits.
+		paused_habits (int): The number of paused habits.
+		inactive_habits (int): The number of inactive habits.
+		total_completions (int): The number of non-deleted completions.
+		active_completions (int): The number of non-deleted completions of active habits.
+		other_completions (int): The number of non-deleted completions of paused or inactive habits.
+		max_best_streak (int): The longest best streak of any habit.
+		top_habits (tuple[Habit, ...]): The habits with the longest best streaks, longest first.
+		longest_streak_habits (tuple[Habit, ...]): All habits whose best streak is max_best_streak.
+	"""
+	active_habits: int
+	paused_habits: int
+	inactive_habits: int
+	total_completions: int
+	active_completions: int
+	other_completions: int
+	max_best_streak: int
+	top_habits: tuple
+	longest_streak_habits: tuple
+
 class Report:
 	"""
 	A utility class that provides methods to generate habit reports.
 
 	Methods:
+		snapshot(top_n: int) -> AnalyticsSnapshot:
+			Computes the analytics page counters and top habits in three queries.
+
 		filter_habits_by_occurrence(occurrence: str) -> QuerySet:
 			Filters habits by their occurrence type (daily, weekly, monthly).
 
 		generate_completion_chart(completions, habit_name, habit_occurrence) -> str:
 			Generates a dynamic Plotly bar chart for a habit's completion history.
 
-		generate_completion_trend_chart() -> str:
+		trend_window(range, bucket) -> tuple:
+			Chooses the first bucket and bucket size of the trend chart.
+
+		completion_trend_data(range, bucket) -> dict:
+			Returns the completion counts per bucket for the trend chart.
+
+		generate_completion_trend_chart(range, bucket) -> str:
 			Generates a Plotly Line Chart for Completion Trends Over Time.
 
-		generate_status_chart() -> str:
+		status_data(snapshot) -> dict:
+			Returns the number of habits per status for the status chart.
+
+		generate_status_chart(snapshot) -> str:
 			Generates a Plotly Pie Chart for Habit Statuses.
 
-		generate_streak_chart() -> str:
+		streak_data(snapshot, scope) -> dict:
+			Returns the best and current streaks of the top habits for the streak chart.
+
+		generate_streak_chart(snapshot) -> str:
 			Generates a Plotly Bar Chart for Habit Streaks.
 
+		completion_history_data(habit, today) -> dict:
+			Returns a habit's completions per calendar bucket for its history chart.
+
+		streak_series(habit, start, end) -> dict:
+			Returns a habit's current and best streak as of every period, in one pass.
+
 		get_habits_with_longest_streak() -> QuerySet:
 			Finds all habits that currently have the longest streak.
 
@@ -355,7 +983,71 @@ class Report:
 			- Number of completions linked to active habits
 			- Number of completions linked to paused or inactive habits
 	"""
-		
+
+	# Trend chart windows in days, bucket sizes in (at most) days, and the point budget
+	TREND_RANGES = {"30d": 30, "90d": 90, "1y": 365, "all": None}
+	TREND_BUCKETS = {"day": 1, "week": 7, "month": 28}
+	TREND_MAX_POINTS = 500
+
+	# Windows of the habit completion history chart
+	HISTORY_WEEKS = 53
+	HISTORY_MONTHS = 24
+
+	# Number of habits on the streak chart
+	STREAK_CHART_HABITS = 5
+
+	# Streak series bucket of each occurrence
+	SERIES_BUCKETS = {"daily": "day", "weekly": "week", "monthly": "month"}
+
+	@staticmethod
+	def snapshot(top_n: int = 5) -> AnalyticsSnapshot:
+		"""
+		Computes the analytics page counters with conditional aggregation, in at
+		most three queries: the habit counters, the completion counters, and the
+		top habits, which come from the cached leaderboard.
+
+		Args:
+			top_n (int): The number of habits in top_habits.
+
+		Returns:
+			AnalyticsSnapshot: The counters and top habits.
+		"""
+		habits = Habit.objects.aggregate(
+			active=Count("habit_id", filter=Q(habit_status="active")),
+			paused=Count("habit_id", filter=Q(habit_status="paused")),
+			inactive=Count("habit_id", filter=Q(habit_status="inactive")),
+			max_best=Max("habit_best_streak"),
+		)
+
+		# Counted from the live completions themselves (the completion_live_habit_date_idx rows),
+		# so bulk writes that bypass the rollup are counted too
+		completions = Completion.objects.filter(completion_deleted=False).aggregate(
+			total=Count("completion_id"),
+			active=Count("completion_id", filter=Q(completion_habit_id__habit_status="active")),
+		)
+
+		from .leaderboard import leaderboard, leaderboard_size
+
+		if top_n <= leaderboard_size():
+			top = leaderboard()[:top_n]
+		else:
+			top = tuple(Habit.objects.order_by("-habit_best_streak", "habit_id")[:top_n])
+		longest = tuple(habit for habit in top if habit.habit_best_streak == habits["max_best"])
+		if top_n and len(longest) == top_n:  # The tie may go beyond the top habits
+			longest = tuple(Habit.objects.filter(habit_best_streak=habits["max_best"]).order_by("habit_id"))
+
+		return AnalyticsSnapshot(
+			active_habits=habits["active"],
+			paused_habits=habits["paused"],
+			inactive_habits=habits["inactive"],
+			total_completions=completions["total"],
+			active_completions=completions["active"],
+			other_completions=completions["total"] - completions["active"],
+			max_best_streak=habits["max_best"] or 0,
+			top_habits=top,
+			longest_streak_habits=longest,
+		)
+
 	@staticmethod
 	def filter_habits_by_occurrence(occurrence: str):
 		"""
@@ -402,126 +1094,278 @@ class Report:
 		x = list(counts.keys())
 		y = list(counts.values())
 
-		fig = go.Figure()
-		fig.add_trace(go.Bar(x=x, y=y, marker_color="blue"))
-
-		# Update layout based on occurrence
-		fig.update_layout(
-			title=f"Completion History for {habit_name}",
-			xaxis_title="Period",
-			yaxis_title="Completions",
-			height=300,
-			yaxis=dict(tickvals=[1], ticktext=["✔"]) if habit_occurrence in ["daily", "weekly", "monthly"] else None
-		)
-		
-		return fig.to_html(full_html=False)
+		from . import charts  # Imported on first render only
+		return charts.completion_chart(x, y, habit_name, habit_occurrence)
 	
 	@staticmethod
-	def generate_completion_trend_chart():
+	def trend_window(range="all", bucket=None, today=None):
+		"""
+		Chooses the first bucket and the bucket size of the completion trend chart.
+
+		The requested bucket is coarsened (day, then week, then month) until the
+		range fits in TREND_MAX_POINTS buckets, so the chart stays small as the
+		history grows.
+
+		Args:
+			range (str): One of TREND_RANGES. Unknown values mean 'all'.
+			bucket (str, optional): 'day', 'week' or 'month'. Defaults to the finest that fits.
+			today (date, optional): The reference date. Defaults to today.
+
+		Returns:
+			tuple[date | None, str]: The first bucket date (None for all history) and the bucket size.
+		"""
+		today = today or datetime.now().date()
+		days = Report.TREND_RANGES.get(range)
+
+		if days is None:  # All history, from the first completed day
+			first = CompletionRollup.objects.filter(rollup_granularity="day").aggregate(first=Min("rollup_bucket_date"))["first"]
+			start, span = None, (today - first).days + 1 if first else 1
+		else:
+			start, span = today - timedelta(days=days - 1), days
+
+		sizes = list(Report.TREND_BUCKETS)
+		for size in sizes[sizes.index(bucket) if bucket in sizes else 0:]:
+			if -(-span // Report.TREND_BUCKETS[size]) <= Report.TREND_MAX_POINTS:
+				break
+
+		if start is not None:  # Align to the bucket containing the first day
+			start = dict(CompletionRollup.bucket_dates(start.toordinal()))[size]
+		return start, size
+
+	@staticmethod
+	def completion_trend_data(range="all", bucket=None, today=None) -> dict:
+		"""
+		Returns the completion counts per bucket as column arrays, for the trend chart.
+
+		Reads the pre-aggregated CompletionRollup rows rather than grouping the
+		completions, at most about TREND_MAX_POINTS of them, see trend_window().
+
+		Args:
+			range (str): One of TREND_RANGES ('30d', '90d', '1y', 'all').
+			bucket (str, optional): 'day', 'week' or 'month'. Defaults to the finest that fits.
+			today (date, optional): The reference date. Defaults to today.
+
+		Returns:
+			dict: {"bucket": size, "x": bucket dates, "y": completion counts}
+		"""
+		start, size = Report.trend_window(range, bucket, today)
+
+		# Read the buckets of the rollup, summed over the habit statuses
+		buckets = CompletionRollup.objects.filter(rollup_granularity=size)
+		if start is not None:
+			buckets = buckets.filter(rollup_bucket_date__gte=start)
+		buckets = buckets.values("rollup_bucket_date").annotate(
+			count=Sum("rollup_count")
+		).filter(count__gt=0).order_by("rollup_bucket_date")
+
+		return {
+			"bucket": size,
+			"x": [item["rollup_bucket_date"].strftime("%Y-%m-%d") for item in buckets],
+			"y": [item["count"] for item in buckets],
+		}
+
+	@staticmethod
+	def generate_completion_trend_chart(range="all", bucket=None, today=None):
 		"""
 		Generate a Plotly Line Chart for Completion Trends Over Time.
 
+		Args:
+			range (str): One of TREND_RANGES ('30d', '90d', '1y', 'all').
+			bucket (str, optional): 'day', 'week' or 'month'. Defaults to the finest that fits.
+			today (date, optional): The reference date. Defaults to today.
+
 		Returns:
 			str: The HTML representation of the chart.
 		"""
-		# Group completions by date and count
-		completions = Completion.objects.filter(completion_deleted=False).values("completion_date").annotate(
-			count=models.Count("completion_id")
-		).order_by("completion_date")
+		data = Report.completion_trend_data(range, bucket, today)
 
-		# Extract dates and counts
-		dates = [item["completion_date"].strftime("%Y-%m-%d") for item in completions]
-		counts = [item["count"] for item in completions]
+		from . import charts  # Imported on first render only
+		return charts.completion_trend_chart(data)
+
+	@staticmethod
+	def status_data(snapshot=None) -> dict:
+		"""
+		Returns the number of habits per status as column arrays, for the status chart.
 
-		# Create the Plotly chart
-		fig = go.Figure()
-		fig.add_trace(go.Scatter(x=dates, y=counts, mode="lines+markers", name="Completions"))
-		fig.update_layout(title="Habit Completion Trends", xaxis_title="Date", yaxis_title="Completions")
+		Args:
+			snapshot (AnalyticsSnapshot, optional): Precomputed counters. Defaults to Report.snapshot().
 
-		return fig.to_html(full_html=False)
+		Returns:
+			dict: {"labels": status names, "values": habit counts}
+		"""
+		snapshot = snapshot or Report.snapshot()
+		return {
+			"labels": ["Active", "Paused", "Inactive"],
+			"values": [snapshot.active_habits, snapshot.paused_habits, snapshot.inactive_habits],
+		}
 
 	@staticmethod
-	def generate_status_chart():
+	def generate_status_chart(snapshot=None):
 		"""
 		Generates a Plotly Pie Chart for Habit Statuses.
 
+		Args:
+			snapshot (AnalyticsSnapshot, optional): Precomputed counters. Defaults to Report.snapshot().
+
 		Returns:
 			str: The HTML representation of the chart.
 		"""
-		# Count habits by status
-		habits = Habit.objects.all()
-		status_counts = {
-			"Active": habits.filter(habit_status="active").count(),
-			"Paused": habits.filter(habit_status="paused").count(),
-			"Inactive": habits.filter(habit_status="inactive").count(),
-		}
+		data = Report.status_data(snapshot)
 
-		# Create the Plotly chart
-		fig = go.Figure(data=[go.Pie(
-			labels=list(status_counts.keys()),
-			values=list(status_counts.values()),
-			marker=dict(colors=["#4CAF50", "#FFC107", "#F44336"])
-		)])
+		from . import charts  # Imported on first render only
+		return charts.status_chart(data)
+
+	@staticmethod
+	def streak_data(snapshot=None, scope="all") -> dict:
+		"""
+		Returns the best and current streaks of the top habits as column arrays, for the streak chart.
+
+		Args:
+			snapshot (AnalyticsSnapshot, optional): Precomputed top habits. Defaults to the cached leaderboard.
+			scope (str): The leaderboard to read without a snapshot, see leaderboard.SCOPES.
+
+		Returns:
+			dict: {"habits": habit names, "best": best streaks, "current": current streaks}
+		"""
+		from .leaderboard import leaderboard
 
-		fig.update_layout(title="Habit Status Breakdown")
-		return fig.to_html(full_html=False)
+		habits = snapshot.top_habits if snapshot else leaderboard(scope)[:Report.STREAK_CHART_HABITS]
+		return {
+			"habits": [habit.habit_name for habit in habits],
+			"best": [habit.habit_best_streak for habit in habits],
+			"current": [habit.peek_current_streak() for habit in habits],  # Read-only, charts never write
+		}
 
 	@staticmethod
-	def generate_streak_chart():
+	def generate_streak_chart(snapshot=None):
 		"""
 		Generates a Plotly Bar Chart for Habit Streaks.
 
+		Args:
+			snapshot (AnalyticsSnapshot, optional): Precomputed top habits. Defaults to the cached leaderboard.
+
 		Returns:
 				str: The HTML representation of the chart.
 		"""
-		# Get top 5 habits by best streak
-		habits = Habit.objects.all().order_by("-habit_best_streak")[:5]  # Top 5 habits by streak
-
-		# Create the Plotly chart
-		fig = go.Figure()
-		fig.add_trace(go.Bar(
-			x=[habit.habit_name for habit in habits], 
-			y=[habit.habit_best_streak for habit in habits],
-			name="Best Streak", marker_color="#007BFF"
-		))
-
-		# Add current streaks
-		fig.add_trace(go.Bar(
-			x=[habit.habit_name for habit in habits], 
-			y=[habit.get_current_streak() for habit in habits],
-			name="Current Streak", marker_color="#34A853"
-		))
-
-		# Update layout
-		fig.update_layout(
-			title="Habit Streak Trends",
-			xaxis_title="Habits",
-			yaxis_title="Number of Days",
-			barmode="group"
+		data = Report.streak_data(snapshot)
+
+		from . import charts  # Imported on first render only
+		return charts.streak_chart(data)
+
+	@staticmethod
+	def completion_history_data(habit, today=None) -> dict:
+		"""
+		Returns a habit's completions per calendar bucket, for its completion history chart.
+
+		The completions are counted in SQL over a fixed window, so the chart has
+		the same size for a new habit and for one with years of history:
+
+			- daily: a heatmap of the last HISTORY_WEEKS weeks, one cell per day
+			- weekly: the completions per week of the last HISTORY_WEEKS weeks
+			- monthly: the completions per month of the last HISTORY_MONTHS months
+
+		Args:
+			habit (Habit): The habit.
+			today (date, optional): The reference date. Defaults to today.
+
+		Returns:
+			dict: {"kind": "heatmap", "x": week dates, "y": weekdays, "z": counts per weekday and week}
+			for daily habits, else {"kind": "bar", "bucket": size, "x": bucket dates, "y": counts}
+		"""
+		today = today or datetime.now().date()
+		day = today.toordinal()
+
+		if habit.habit_occurrence == "monthly":
+			size, bucket = "month", TruncMonth("completion_date", output_field=models.DateField())
+			first = today.year * 12 + today.month - Report.HISTORY_MONTHS
+			buckets = [date(month // 12, month % 12 + 1, 1) for month in range(first, first + Report.HISTORY_MONTHS)]
+		else:
+			monday = day - (day - 1) % 7
+			buckets = [date.fromordinal(monday - 7 * week) for week in range(Report.HISTORY_WEEKS - 1, -1, -1)]
+			if habit.habit_occurrence == "daily":
+				size, bucket = "day", F("completion_day")
+			else:
+				size, bucket = "week", TruncWeek("completion_date", output_field=models.DateField())
+
+		# Count the completions of the window per bucket, using the habit's day index
+		counts = dict(
+			habit.completions.filter(
+				completion_deleted=False, completion_day__gte=buckets[0].toordinal(), completion_day__lte=day
+			).annotate(bucket=bucket).values("bucket").annotate(count=Count("completion_id")).values_list("bucket", "count").order_by()
 		)
 
-		return fig.to_html(full_html=False)
+		labels = [value.strftime("%Y-%m-%d") for value in buckets]
+		if size != "day":
+			return {"kind": "bar", "bucket": size, "x": labels, "y": [counts.get(value, 0) for value in buckets]}
+
+		# One row per weekday and one column per week, days after today are left empty
+		z = [
+			[counts.get(value.toordinal() + weekday, 0) if value.toordinal() + weekday <= day else None for value in buckets]
+			for weekday in range(7)
+		]
+		return {"kind": "heatmap", "x": labels, "y": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], "z": z}
+
+	@staticmethod
+	def streak_series(habit, start=None, end=None) -> dict:
+		"""
+		Returns the current and best streak of a habit as of every period of a window,
+		for its streak chart.
+
+		The completions are read once and swept in a single pass, see
+		streaks.scan_streak_series(), so the cost grows linearly with the history
+		and the window rather than with their product, and nothing is written.
+
+		Args:
+			habit (Habit): The habit.
+			start (date, optional): The first day of the window. Defaults to the first completion.
+			end (date, optional): The last day of the window. Defaults to today.
+
+		Returns:
+			dict: {"bucket": size, "x": period dates, "current": current streaks, "best": best streaks so far}
+		"""
+		end = end or datetime.now().date()
+		occurrence = habit.habit_occurrence
+
+		days = habit.completions.filter(completion_deleted=False, completion_day__lte=end.toordinal()).order_by(
+			"completion_day"
+		).values_list("completion_day", flat=True)
+		periods = [day_period(occurrence, day) for day in days]
+
+		last = period_ordinal(occurrence, end)
+		first = period_ordinal(occurrence, start) if start else (periods[0] if periods else last)
+		current, best = scan_streak_series(periods, first, last, decays=cutoff_period(occurrence, end) is not None)
+
+		return {
+			"bucket": Report.SERIES_BUCKETS[occurrence],
+			"x": [period_start(occurrence, period).strftime("%Y-%m-%d") for period in range(first, last + 1)],
+			"current": current,
+			"best": best,
+		}
 
 	@staticmethod
 	def get_habits_with_longest_streak():
 		"""
 		Finds all habits that currently have the longest streak.
 
+		Ranks by the stored best streak, as snapshot() and the leaderboards do,
+		reading the maximum from the top of the habit_best_streak_idx index.
+
 		Returns:
 			QuerySet: The habits with the longest streak.
 		"""
 		# Get the maximum streak value
-		max_streak = Habit.objects.aggregate(max_streak=Max("habit_best_streak"))["max_streak"]
-		
+		max_streak = Habit.objects.order_by("-habit_best_streak").values_list("habit_best_streak", flat=True).first()
+
 		if max_streak is None:  # Handle case when no habits exist
 			return []
 
-		return Habit.objects.filter(habit_best_streak=max_streak)
+		return Habit.objects.filter(habit_best_streak=max_streak).order_by("habit_id")
 	
 	@staticmethod
 	def get_longest_streak(habit_id: int) -> int:
 		"""
-		Calculates the longest consecutive streak of completions for a given habit.
+		Calculates the longest consecutive streak of completions for a given habit,
+		counted in the habit's own periods (days, ISO weeks or months).
 
 		Args:
 			habit_id (int): The ID of the habit.
@@ -530,32 +1374,11 @@ class Report:
 			int: The longest streak count.
 		"""
 		try:
-			habit = Habit.objects.get(habit_id=habit_id)
-			completions = habit.completions.filter(completion_deleted=False).order_by("completion_date")
-
-			if not completions:
-				return 0
-			
-			# Calculate the longest streak
-			longest_streak = 1
-			current_streak = 1
-			prev_date = completions.first().completion_date.date() # Initialize with the first completion date
-
-			# Iterate over completions to find the longest streak
-			for completion in completions[1:]:
-				if completion.completion_date.date() == prev_date + timedelta(days=1):
-					current_streak += 1     
-				else:
-					longest_streak = max(longest_streak, current_streak)
-					current_streak = 1                      # Reset streak if there's a gap
-				prev_date = completion.completion_date.date()
-
-			return max(longest_streak, current_streak)      # Return the longest streak found
-		
+			return Habit.objects.get(habit_id=habit_id).get_best_streak()
+
 		# Handle Habit.DoesNotExist exception
 		except Habit.DoesNotExist:
 			return 0 
-        
 
 	@staticmethod
 	def habits_completed_count():
@@ -0,0 +1,123 @@
+"""
+Keyset (cursor) pagination for the habit list and the completion history.
+
+Instead of OFFSET, every page continues after (or before) the sort key and
+habit ID of the last row seen, with a row-value comparison that the database
+answers from an index. Every page therefore costs the same, however deep.
+"""
+import base64
+import json
+from typing import NamedTuple, Optional
+
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+# Sort options of the habit list: (field, descending), each backed by an index
+SORTS = {
+	"habit_name": ("habit_name", False),
+	"streak": ("habit_best_streak", True),
+	"habit_occurrence": ("habit_occurrence", False),
+}
+
+# Sort of a habit's completion history, newest first, backed by the live day index
+HISTORY_SORTS = {
+	"recent": ("completion_day", True),
+}
+
+class KeysetPage(NamedTuple):
+	"""
+	One page of a keyset-paginated queryset.
+
+	Attributes:
+		items (list): The rows of the page, in sort order.
+		next_cursor (str | None): The cursor of the next page, if there is one.
+		prev_cursor (str | None): The cursor of the previous page, if there is one.
+	"""
+	items: list
+	next_cursor: Optional[str]
+	prev_cursor: Optional[str]
+
+def encode_cursor(key, pk):
+	"""
+	Encode the sort key and primary key of a row as an opaque URL-safe cursor.
+	"""
+	return base64.urlsafe_b64encode(json.dumps([key, pk]).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+	"""
+	Decode a cursor from encode_cursor().
+
+	Args:
+		cursor (str): The cursor.
+
+	Returns:
+		tuple | None: (sort key, primary key), or None if the cursor is malformed.
+	"""
+	try:
+		key, pk = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+	except (ValueError, TypeError):
+		return None
+	if not isinstance(key, (str, int)) or isinstance(key, bool) or not isinstance(pk, int):
+		return None
+	return key, pk
+
+def _after(queryset, field, key, pk, descending):
+	"""
+	Filter the rows that come after (key, pk) in the sort order, as one row-value comparison.
+	"""
+	model = queryset.model
+	quote = connection.ops.quote_name
+	columns = (
+		f"{quote(model._meta.db_table)}.{quote(model._meta.get_field(field).column)}, "
+		f"{quote(model._meta.db_table)}.{quote(model._meta.pk.column)}"
+	)
+	operator = "<" if descending else ">"
+	return queryset.filter(RawSQL(f"({columns}) {operator} (%s, %s)", (key, pk), output_field=BooleanField()))
+
+def paginate(queryset, sort, page_size, after=None, before=None, sorts=SORTS):
+	"""
+	Return one page of the queryset in the given sort order, after or before a cursor.
+
+	Rows are ordered by (sort field, primary key), both in the sort's direction,
+	so that ties are broken consistently and the index covers the whole order.
+
+	Args:
+		queryset (QuerySet): The rows to paginate, without ordering.
+		sort (str): One of sorts.
+		page_size (int): The number of rows per page.
+		after (str, optional): Return the page after this cursor.
+		before (str, optional): Return the page before this cursor. Ignored if after is given.
+		sorts (dict, optional): The allowed sorts, SORTS or HISTORY_SORTS.
+
+	Returns:
+		KeysetPage: The rows and the cursors of the neighbouring pages.
+	"""
+	field, descending = sorts[sort]
+	pk = queryset.model._meta.pk.name
+	after, before = after and decode_cursor(after), before and decode_cursor(before)
+
+	backwards = bool(before and not after)
+	reverse = descending != backwards  # Walk back by flipping the order
+	ordering = [f"-{field}", f"-{pk}"] if reverse else [field, pk]
+
+	cursor = before if backwards else after
+	if cursor:
+		queryset = _after(queryset, field, *cursor, reverse)
+
+	items = list(queryset.order_by(*ordering)[:page_size + 1])
+	has_more = len(items) > page_size
+	items = items[:page_size]
+	if backwards:
+		items.reverse()
+
+	def cursor_of(item):
+		return encode_cursor(getattr(item, field), getattr(item, pk))
+
+	has_next = has_more if not backwards else True
+	has_prev = bool(cursor) if not backwards else has_more
+	return KeysetPage(
+		items,
+		cursor_of(items[-1]) if items and has_next else None,
+		cursor_of(items[0]) if items and has_prev else None,
+	)
@@ -0,0 +1,56 @@
+from .chart_cache import bump_data_version
+from .leaderboard import update_leaderboards
+from .models import Habit, Completion, CompletionRollup, StreakRun
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+@receiver([post_save, post_delete], sender=Habit)
+def habit_changed(sender, instance, **kwargs):
+  """
+  Invalidates the cached charts showing a saved or deleted habit.
+  """
+  bump_data_version(instance.habit_id)
+
+@receiver(post_save, sender=Habit)
+def habit_saved(sender, instance, **kwargs):
+  """
+  Moves a saved habit within the cached streak leaderboards.
+  """
+  update_leaderboards(instance)
+
+@receiver(pre_delete, sender=Habit)
+def habit_deleting(sender, instance, **kwargs):
+  """
+  Removes the completions of a habit about to be deleted from the rollup, in one pass.
+  """
+  CompletionRollup.move_habit(instance, instance.counted_status(), None)
+
+@receiver(post_delete, sender=Habit)
+def habit_deleted(sender, instance, **kwargs):
+  """
+  Removes a deleted habit from the cached streak leaderboards.
+  """
+  update_leaderboards(instance, deleted=True)
+
+@receiver([post_save, post_delete], sender=Completion)
+def completion_changed(sender, instance, **kwargs):
+  """
+  Invalidates the cached charts showing a saved or deleted completion.
+  """
+  bump_data_version(instance.completion_habit_id_id)
+
+@receiver(post_delete, sender=Completion)
+def completion_deleted(sender, instance, origin=None, **kwargs):
+  """
+  Removes a hard-deleted live completion from its habit's streak runs and the rollup,
+  as Completion.save() does for soft deletes.
+  """
+  origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+  day = getattr(instance, "_stored_day", instance._live_day())
+  if origin_model is Habit or day is None:  # Deleted with its habit (see habit_deleting()), or not counted
+    return
+
+  habit = instance.completion_habit_id
+  StreakRun.discard(habit, day)
+  CompletionRollup.record(habit.counted_status(), [day], -1)
@@ -0,0 +1,101 @@
+/**
+ * Draws the charts marked with data-chart-url once they scroll into view,
+ * from the compact column arrays returned by the chart data endpoints.
+ */
+(function () {
+  "use strict";
+
+  // Plotly traces and layout per chart type, matching the Report.generate_* charts
+  const builders = {
+    trend: (data) => ({
+      data: [{ type: "scatter", x: data.x, y: data.y, mode: "lines+markers", name: "Completions" }],
+      layout: {
+        title: "Habit Completion Trends",
+        xaxis: { title: data.bucket.charAt(0).toUpperCase() + data.bucket.slice(1) },
+        yaxis: { title: "Completions" },
+      },
+    }),
+    status: (data) => ({
+      data: [{ type: "pie", labels: data.labels, values: data.values, marker: { colors: ["#4CAF50", "#FFC107", "#F44336"] } }],
+      layout: { title: "Habit Status Breakdown" },
+    }),
+    streak: (data) => ({
+      data: [
+        { type: "bar", x: data.habits, y: data.best, name: "Best Streak", marker: { color: "#007BFF" } },
+        { type: "bar", x: data.habits, y: data.current, name: "Current Streak", marker: { color: "#34A853" } },
+      ],
+      layout: { title: "Habit Streak Trends", xaxis: { title: "Habits" }, yaxis: { title: "Number of Days" }, barmode: "group" },
+    }),
+    history: (data, element) => (data.kind === "heatmap" ? {
+      data: [{
+        type: "heatmap", x: data.x, y: data.y, z: data.z, xgap: 2, ygap: 2, showscale: false,
+        colorscale: [[0, "#ebedf0"], [1, "blue"]], zmin: 0, zmax: 1, hoverongaps: false,
+      }],
+      layout: {
+        title: element.dataset.chartTitle,
+        xaxis: { title: "Week" },
+        yaxis: { autorange: "reversed" },
+        height: 300,
+      },
+    } : {
+      data: [{ type: "bar", x: data.x, y: data.y, marker: { color: "blue" } }],
+      layout: {
+        title: element.dataset.chartTitle,
+        xaxis: { title: data.bucket.charAt(0).toUpperCase() + data.bucket.slice(1) },
+        yaxis: { title: "Completions", rangemode: "tozero" },
+        height: 300,
+      },
+    }),
+    streaks: (data, element) => ({
+      data: [
+        { type: "scatter", x: data.x, y: data.current, mode: "lines", line: { shape: "hv" }, name: "Current Streak", marker: { color: "#34A853" } },
+        { type: "scatter", x: data.x, y: data.best, mode: "lines", line: { shape: "hv", dash: "dot" }, name: "Best Streak", marker: { color: "#007BFF" } },
+      ],
+      layout: {
+        title: element.dataset.chartTitle,
+        xaxis: { title: data.bucket.charAt(0).toUpperCase() + data.bucket.slice(1) },
+        yaxis: { title: "Streak", rangemode: "tozero" },
+        height: 300,
+      },
+    }),
+  };
+
+  function draw(element) {
+    fetch(element.dataset.chartUrl, { headers: { Accept: "application/json" } })
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.json();
+      })
+      .then((data) => {
+        const figure = builders[element.dataset.chart](data, element);
+        element.textContent = "";
+        Plotly.newPlot(element, figure.data, figure.layout, { responsive: true });
+      })
+      .catch(() => {
+        element.textContent = "Chart unavailable.";
+      });
+  }
+
+  document.addEventListener("DOMContentLoaded", () => {
+    const charts = document.querySelectorAll("[data-chart-url]");
+
+    if (!("IntersectionObserver" in window)) {
+      charts.forEach(draw);
+      return;
+    }
+
+    // Start loading a little before the chart becomes visible
+    const observer = new IntersectionObserver((entries) => {
+      entries.forEach((entry) => {
+        if (entry.isIntersecting) {
+          observer.unobserve(entry.target);
+          draw(entry.target);
+        }
+      });
+    }, { rootMargin: "200px" });
+
+    charts.forEach((chart) => observer.observe(chart));
+  });
+})();
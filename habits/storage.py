@@ -0,0 +1,58 @@
+"""
+Static files storage with content-hashed names and precompressed variants.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+	import brotli
+except ImportError:  # Optional, only gzip variants are written without it
+	brotli = None
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+	"""
+	ManifestStaticFilesStorage that also writes .gz (and .br, if brotli is
+	installed) next to every hashed text asset during collectstatic, for a web
+	server to serve as is (e.g. nginx gzip_static/brotli_static).
+
+	Attributes:
+		manifest_strict (bool): False, so a file missing from the manifest falls back to its hashed name.
+		COMPRESSIBLE (tuple): The extensions worth compressing.
+	"""
+
+	manifest_strict = False
+	COMPRESSIBLE = (".css", ".js", ".json", ".map", ".svg", ".txt", ".html")
+
+	def post_process(self, paths, dry_run=False, **options):
+		"""
+		Hashes the files like ManifestStaticFilesStorage, then compresses the hashed copies.
+		"""
+		hashed = set()
+		for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+			if hashed_name and not isinstance(processed, Exception):
+				hashed.add(hashed_name)
+			yield name, hashed_name, processed
+
+		if dry_run:
+			return
+
+		for name in sorted(hashed):
+			if name.endswith(self.COMPRESSIBLE):
+				self._compress(name)
+
+	def _compress(self, name):
+		"""
+		Writes the compressed variants of one file, unless they are not smaller.
+		"""
+		with self.open(name) as original:
+			content = original.read()
+
+		variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+		if brotli is not None:
+			variants[".br"] = brotli.compress(content)
+
+		for extension, compressed in variants.items():
+			if len(compressed) < len(content):
+				with open(self.path(name) + extension, "wb") as target:
+					target.write(compressed)
@@ -0,0 +1,70 @@
+"""
+Cache for current streaks, valid until the habit's next period boundary.
+
+A current streak only changes when the habit's data changes or when a period
+boundary passes (midnight, the ISO Monday or the 1st of the month). Entries are
+keyed on the habit's data version from chart_cache.py, its streak fields and
+the current period, and expire at the next boundary, so repeated reads within a period cost
+one cache lookup.
+"""
+from datetime import datetime
+
+from django.core.cache import cache
+
+from .chart_cache import data_version
+from .streaks import next_period_start, period_ordinal
+
+# The habit fields a current streak is computed from
+STATE_FIELDS = ["habit_status", "habit_occurrence", "habit_last_period", "habit_run_streak", "habit_last_streak"]
+
+def streak_key(habit, now=None, version=None):
+	"""
+	Return the cache key of a habit's current streak, for its data version and the current period.
+
+	The key also holds the habit's own streak fields, so an instance changed in
+	memory or in a transaction that has not committed yet (when the version is
+	not bumped yet) never reads an entry computed from other values.
+	"""
+	today = (now or datetime.now()).date()
+	parts = [
+		habit.habit_id, data_version(habit.habit_id) if version is None else version, period_ordinal(habit.habit_occurrence, today),
+		*(getattr(habit, field) for field in STATE_FIELDS),
+	]
+	return "habits:streak:" + ":".join(str(part) for part in parts)
+
+def seconds_until_boundary(occurrence, now=None):
+	"""
+	Return the number of seconds until the next period boundary of an occurrence, at least 1.
+	"""
+	now = now or datetime.now()
+	boundary = datetime.combine(next_period_start(occurrence, now.date()), datetime.min.time())
+	return max(1, int((boundary - now).total_seconds()))
+
+def peek_cached_streak(habit):
+	"""
+	Return a habit's cached current streak, or None on a miss. Never stores anything.
+
+	Only cached_streak() fills the cache, with the authoritative computation, so
+	read-only estimates such as Habit.peek_current_streak() never end up in it.
+	"""
+	return cache.get(streak_key(habit))
+
+def cached_streak(habit, compute):
+	"""
+	Return a habit's current streak from the cache, computing and storing it on a miss.
+
+	Args:
+		habit (Habit): The habit.
+		compute (Callable[[], int]): Computes the authoritative current streak, see Habit.get_current_streak().
+
+	Returns:
+		int: The current streak count.
+	"""
+	now = datetime.now()
+	version = data_version(habit.habit_id)  # Read first, a concurrent change then invalidates the entry
+
+	streak = cache.get(streak_key(habit, now, version))
+	if streak is None:
+		streak = compute()  # May rebuild the streak fields, store under their new values
+		cache.set(streak_key(habit, now, version), streak, seconds_until_boundary(habit.habit_occurrence, now))
+	return streak
@@ -0,0 +1,91 @@
+"""
+Streak computation inside the database, as a gaps-and-islands query.
+
+Numbering a habit's distinct period ordinals with ROW_NUMBER() gives
+consecutive periods the same value of (period - row_number), so every island
+of consecutive periods becomes one GROUP BY bucket. Only the resulting
+numbers leave the database, never the completion rows.
+
+Requires SQLite 3.25+ for window functions.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Habit, Completion
+from .streaks import period_ordinal
+
+# Period ordinals matching streaks.day_period()
+PERIOD_SQL = """
+	CASE h.habit_occurrence
+		WHEN 'weekly' THEN (c.completion_day - 1) / 7
+		WHEN 'monthly' THEN CAST(strftime('%%Y', c.completion_date) AS INTEGER) * 12 + CAST(strftime('%%m', c.completion_date) AS INTEGER) - 1
+		ELSE c.completion_day
+	END
+"""
+
+STREAKS_SQL = """
+	WITH periods AS (
+		SELECT DISTINCT h.habit_id AS habit_id, h.habit_occurrence AS occurrence, {period} AS period
+		FROM {completion} c
+		JOIN {habit} h ON h.habit_id = c.{habit_fk}
+		WHERE c.completion_deleted = %(false)s {habit_filter}
+	),
+	islands AS (
+		SELECT habit_id, occurrence, period,
+			period - ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY period) AS island
+		FROM periods
+		WHERE occurrence != 'daily' OR period <= %(today)s  -- Future completions do not count
+	),
+	runs AS (
+		SELECT habit_id, occurrence, COUNT(*) AS length, MAX(period) AS last_period,
+			MAX(MAX(period)) OVER (PARTITION BY habit_id) AS latest
+		FROM islands
+		GROUP BY habit_id, occurrence, island
+	)
+	SELECT habit_id,
+		MAX(CASE WHEN last_period = latest AND (occurrence != 'daily' OR latest >= %(today)s - 1)
+			THEN length ELSE 0 END) AS current,
+		MAX(length) AS best
+	FROM runs
+	GROUP BY habit_id
+"""
+
+def streak_backend():
+	"""
+	Return the configured streak backend, 'python' (default) or 'sql'.
+	"""
+	return getattr(settings, "HABITS_STREAK_BACKEND", "python")
+
+def sql_streaks(habit_id=None, today=None):
+	"""
+	Compute the current and best streak of one habit, or of all habits, in a single statement.
+
+	Follows the same rules as StreakRun.state(): daily streaks ignore future
+	completions and break once a day is missed.
+
+	Args:
+		habit_id (int, optional): Only compute this habit. Defaults to all habits.
+		today (date, optional): The reference date. Defaults to today.
+
+	Returns:
+		dict[int, tuple[int, int]]: (current, best) per habit ID, for habits with completions.
+	"""
+	fk = Completion._meta.get_field("completion_habit_id").column
+	sql = STREAKS_SQL.format(
+		period=PERIOD_SQL,
+		completion=Completion._meta.db_table,
+		habit=Habit._meta.db_table,
+		habit_fk=fk,
+		habit_filter="" if habit_id is None else "AND h.habit_id = %(habit_id)s",
+	)
+	params = {
+		"false": False,
+		"today": period_ordinal("daily", today or datetime.now().date()),
+		"habit_id": habit_id,
+	}
+
+	with connection.cursor() as cursor:
+		cursor.execute(sql, params)
+		return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
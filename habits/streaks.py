@@ -0,0 +1,220 @@
+"""
+Period arithmetic shared by the habit streak calculations.
+
+Every completion is mapped to an integer period ordinal for its habit's
+occurrence, so that two consecutive periods always differ by exactly one:
+
+	- daily: the proleptic Gregorian day ordinal (date.toordinal())
+	- weekly: the index of the ISO week, counted in Mondays since 0001-01-01
+	- monthly: year * 12 + month - 1
+"""
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional
+
+def period_ordinal(occurrence, value):
+	"""
+	Map a completion date to its period ordinal.
+
+	Args:
+		occurrence (str): One of 'daily', 'weekly', 'monthly'.
+		value (date | datetime): The completion date.
+
+	Returns:
+		int: The period ordinal.
+	"""
+	if occurrence == "weekly":
+		return (value.toordinal() - 1) // 7  # 0001-01-01 is a Monday
+	if occurrence == "monthly":
+		return value.year * 12 + value.month - 1
+	return value.toordinal()
+
+def day_period(occurrence, day):
+	"""
+	Map a stored day ordinal (Completion.completion_day) to its period ordinal.
+
+	Args:
+		occurrence (str): One of 'daily', 'weekly', 'monthly'.
+		day (int): The day ordinal.
+
+	Returns:
+		int: The period ordinal.
+	"""
+	if occurrence == "weekly":
+		return (day - 1) // 7
+	if occurrence == "monthly":
+		return period_ordinal(occurrence, date.fromordinal(day))
+	return day
+
+def period_start(occurrence, period):
+	"""
+	Map a period ordinal back to the first day of the period.
+
+	Args:
+		occurrence (str): One of 'daily', 'weekly', 'monthly'.
+		period (int): The period ordinal.
+
+	Returns:
+		date: The day, the Monday of the ISO week, or the 1st of the month.
+	"""
+	if occurrence == "weekly":
+		return date.fromordinal(period * 7 + 1)
+	if occurrence == "monthly":
+		return date(period // 12, period % 12 + 1, 1)
+	return date.fromordinal(period)
+
+def period_days(occurrence, period):
+	"""
+	Return the first and last day ordinals of a period, e.g. to find its completions.
+
+	Args:
+		occurrence (str): One of 'daily', 'weekly', 'monthly'.
+		period (int): The period ordinal.
+
+	Returns:
+		tuple[int, int]: The day ordinals of the first and last day, inclusive.
+	"""
+	return period_start(occurrence, period).toordinal(), period_start(occurrence, period + 1).toordinal() - 1
+
+def cutoff_period(occurrence, today=None):
+	"""
+	Return the current period for occurrences whose streak lapses with the calendar.
+
+	Daily streaks only count completions up to today and break once a day is
+	missed. Weekly and monthly streaks are counted up to their latest completion.
+
+	Args:
+		occurrence (str): One of 'daily', 'weekly', 'monthly'.
+		today (date, optional): The reference date. Defaults to today.
+
+	Returns:
+		int | None: Today's period ordinal, or None if the streak never lapses.
+	"""
+	if occurrence != "daily":
+		return None
+	return period_ordinal(occurrence, today or datetime.now().date())
+
+def next_period_start(occurrence, today=None):
+	"""
+	Return the first day of the period after today's, when a current streak can next lapse.
+
+	Args:
+		occurrence (str): One of 'daily', 'weekly', 'monthly'.
+		today (date, optional): The reference date. Defaults to today.
+
+	Returns:
+		date: The next midnight, ISO Monday or 1st of the month.
+	"""
+	today = today or datetime.now().date()
+
+	if occurrence == "weekly":
+		return today + timedelta(days=7 - today.weekday())
+	if occurrence == "monthly":
+		return date(today.year + today.month // 12, today.month % 12 + 1, 1)
+	return today + timedelta(days=1)
+
+def extend_run(last_period, run, period):
+	"""
+	Advance a running streak by one completed period in constant time.
+
+	Args:
+		last_period (int): The latest completed period so far.
+		run (int): The length of the run ending at last_period.
+		period (int): The newly completed period.
+
+	Returns:
+		int | None: The length of the run ending at max(last_period, period),
+		or None if the period lies before last_period and the run has to be rebuilt.
+	"""
+	if period < last_period:  # Backdated completion
+		return None
+	if period == last_period:  # Same period, nothing changes
+		return run
+	if period == last_period + 1:  # Consecutive period
+		return run + 1
+	return 1  # Gap, streak restarts
+
+def live_streak(last_period, run, cutoff):
+	"""
+	Return the current streak for a run, taking the calendar cutoff into account.
+
+	Args:
+		last_period (int | None): The latest completed period.
+		run (int): The length of the run ending at last_period.
+		cutoff (int | None): The current period, see cutoff_period().
+
+	Returns:
+		int: The current streak count.
+	"""
+	if last_period is None:
+		return 0
+	if cutoff is not None and last_period < cutoff - 1:  # Previous period was missed
+		return 0
+	return run
+
+def period_runs(periods):
+	"""
+	Split sorted period ordinals into runs of consecutive periods.
+
+	Args:
+		periods (Iterable[int]): Period ordinals in ascending order, duplicates allowed.
+
+	Returns:
+		list[tuple[int, int]]: The (first, last) period of each run, in order.
+	"""
+	runs = []
+	for period in periods:
+		if runs and period <= runs[-1][1] + 1:
+			runs[-1] = (runs[-1][0], max(runs[-1][1], period))
+		else:
+			runs.append((period, period))
+	return runs
+
+class StreakState(NamedTuple):
+	"""
+	The streak counters of a habit, as computed by StreakRun.state().
+
+	Attributes:
+		current (int): The current streak, see live_streak().
+		best (int): The longest run of consecutive periods.
+		last_period (int | None): The latest completed period.
+		run (int): The length of the run ending at last_period.
+	"""
+	current: int
+	best: int
+	last_period: Optional[int]
+	run: int
+
+def scan_streak_series(periods, first, last, decays=True):
+	"""
+	Compute the current and best streak as of every period from first to last, in one pass.
+
+	The sorted periods are consumed with a single pointer while the output
+	periods advance, so the cost is O(len(periods) + last - first) rather than
+	one scan per output period.
+
+	Args:
+		periods (Sequence[int]): Period ordinals in ascending order, duplicates allowed.
+		first (int): The first period of the series.
+		last (int): The last period of the series. Later periods are ignored.
+		decays (bool): Whether a missed period breaks the current streak, see cutoff_period().
+
+	Returns:
+		tuple[list[int], list[int]]: The current and the best streak as of each period.
+	"""
+	current, best_series = [], []
+	best = run = 0
+	previous = None
+	i, count = 0, len(periods)
+
+	for period in range(first, last + 1):
+		while i < count and periods[i] <= period:
+			if periods[i] != previous:  # Several completions in the same period count once
+				run = run + 1 if previous is not None and periods[i] == previous + 1 else 1
+				best = max(best, run)
+				previous = periods[i]
+			i += 1
+
+		current.append(live_streak(previous, run, period if decays else None))
+		best_series.append(best)
+
+	return current, best_series
@@ -0,0 +1,40 @@
+import timeit
+import plotly.graph_objects as go
+from datetime import date, timedelta
+from habits import charts
+
+def _trend_data(points):
+  """
+  Returns a trend series of the given number of daily points.
+  """
+  start = date(2020, 1, 1)
+  return [(start + timedelta(days=i)).isoformat() for i in range(points)], [i % 7 for i in range(points)]
+
+def _graph_objects(x, y):
+  """
+  Renders the trend chart with plotly.graph_objects, as Report used to.
+  """
+  fig = go.Figure()
+  fig.add_trace(go.Scatter(x=x, y=y, mode="lines+markers", name="Completions"))
+  fig.update_layout(title="Habit Completion Trends", xaxis_title="Day", yaxis_title="Completions")
+  return fig.to_html(include_plotlyjs=False, full_html=False)
+
+def _dicts(x, y):
+  """
+  Renders the same chart with the dict-based builder.
+  """
+  layout = charts.layout(title="Habit Completion Trends", xaxis={"title": "Day"}, yaxis={"title": "Completions"})
+  return charts.to_html([charts.scatter(x, y, mode="lines+markers", name="Completions")], layout)
+
+def test_dict_builder_is_faster_than_graph_objects():
+  """
+  Test that skipping plotly's validators renders a 500 point chart several times faster.
+  """
+  x, y = _trend_data(500)
+  _dicts(x, y)  # Warm up the template cache
+
+  validated = min(timeit.repeat(lambda: _graph_objects(x, y), number=20, repeat=5))
+  direct = min(timeit.repeat(lambda: _dicts(x, y), number=20, repeat=5))
+
+  assert validated / direct > 5, \
+    f"graph_objects: {validated / 20 * 1000:.2f} ms, dicts: {direct / 20 * 1000:.2f} ms, {validated / direct:.1f}x"
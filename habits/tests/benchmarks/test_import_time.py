@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+
+def _import_times(*command):
+  """
+  Runs a manage.py command under -X importtime and returns the cumulative import time per module, in µs.
+  """
+  result = subprocess.run(
+    [sys.executable, "-X", "importtime", "manage.py", *command], cwd=BASE_DIR, capture_output=True, text=True, check=True
+  )
+  times = {}
+  for line in result.stderr.splitlines():
+    if line.startswith("import time:") and "|" in line:
+      _, cumulative, module = line[len("import time:"):].split("|")
+      if cumulative.strip().isdigit():
+        times[module.strip()] = int(cumulative)
+  return times
+
+def test_manage_py_check_skips_charting_imports():
+  """
+  Test that starting Django does not import plotly, numpy or the chart renderers.
+  """
+  times = _import_times("check")
+
+  slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:5]
+  slowest = ", ".join(f"{module}: {us / 1000:.1f} ms" for module, us in slowest)
+
+  assert "habits.signals" in times # The app was loaded
+  heavy = sorted(module for module in times if module.split(".")[0] in ("plotly", "numpy", "pandas"))
+  assert not heavy, f"{heavy}, slowest imports: {slowest}"
+  assert "habits.charts" not in times, f"slowest imports: {slowest}" # Imported on the first chart only
@@ -0,0 +1,56 @@
+import timeit
+import pytest
+from datetime import date, timedelta
+from habits.models import Habit, Completion, StreakRun
+from habits.streaks import scan_streak_series
+
+def _daily_history(years):
+  """
+  Returns an unbroken run of daily completion dates ending today.
+  """
+  today = date.today()
+  return [today - timedelta(days=i) for i in range(years * 365 - 1, -1, -1)]
+
+def _habit_with_history(years):
+  """
+  Creates a daily habit completed on every day of its history, with its streak runs.
+  """
+  habit = Habit.objects.create(habit_name=f"{years} years", habit_occurrence="daily", habit_status="active")
+  Completion.objects.bulk_create([
+    Completion(completion_habit_id=habit, completion_date=day, completion_day=day.toordinal()) for day in _daily_history(years)
+  ])
+  StreakRun.rebuild(habit)
+  return habit
+
+def _best_time(habit):
+  """
+  Returns the best time of recomputing the habit's streak counters, as the views do.
+  """
+  def run():
+    habit.habit_last_period = None  # Force the counters to be written again
+    habit.refresh_streaks()
+  return min(timeit.repeat(run, number=10, repeat=5))
+
+@pytest.mark.django_db
+def test_daily_streak_does_not_grow_with_history():
+  """
+  Test that refreshing a 10-year daily streak costs about the same as a 1-year streak.
+  """
+  one_year, ten_years = _habit_with_history(1), _habit_with_history(10)
+
+  assert ten_years.refresh_streaks() == 3650 # Whole history counts
+
+  ratio = _best_time(ten_years) / _best_time(one_year)
+
+  assert ratio < 3, f"{ratio:.1f}x" # Read from the runs, a scan of the completions would be ~10x
+
+def test_streak_series_scales_linearly():
+  """
+  Test that the streak of every day of a 10-year history costs about ten times that of 1 year.
+  """
+  def best_time(years):
+    periods = [d.toordinal() for d in _daily_history(years)]
+    return min(timeit.repeat(lambda: scan_streak_series(periods, periods[0], periods[-1]), number=5, repeat=5))
+
+  assert scan_streak_series([1, 2, 3], 1, 3) == ([1, 2, 3], [1, 2, 3])
+  assert best_time(10) / best_time(1) < 25 # Linear is ~10x, one scan per day would be ~100x
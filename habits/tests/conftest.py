@@ -1,7 +1,25 @@
 import pytest
 from datetime import datetime, timedelta
+from django.core.cache import cache
 from habits.models import Habit, Completion
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Starts every test with an empty cache, so no chart is rendered from another test's data.
+    """
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def static_storage(settings):
+    """
+    Serves static files by their plain names, as collectstatic has not built the manifest.
+    """
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
+
 @pytest.fixture
 def habit_fixtures(db):
     """
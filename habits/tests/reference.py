@@ -0,0 +1,40 @@
+"""
+Reference streak kernel the streak engines are checked against in the tests.
+
+It scans a habit's sorted period ordinals directly, the way the streaks were
+computed before they were read from the streak runs (StreakRun.state()).
+"""
+from bisect import bisect_right
+from itertools import islice
+
+from habits.streaks import StreakState, live_streak
+
+def scan_streaks(periods, cutoff=None):
+  """
+  Compute the current and best streak in a single pass over sorted period ordinals.
+
+  Membership is never tested against the list: each period is only compared
+  with its predecessor, and future periods are cut off with a binary search,
+  so long streaks cost O(n) rather than O(n^2).
+
+  Args:
+    periods (Sequence[int]): Period ordinals in ascending order, duplicates allowed.
+    cutoff (int | None): The current period, see habits.streaks.cutoff_period(). Later periods are ignored.
+
+  Returns:
+    StreakState: The streak counters.
+  """
+  best = run = 0
+  last = None
+  end = len(periods) if cutoff is None else bisect_right(periods, cutoff)  # Future completions do not count
+
+  for period in islice(periods, end):
+    if period == last:  # Several completions in the same period count once
+      continue
+
+    run = run + 1 if last is not None and period == last + 1 else 1
+    if run > best:
+      best = run
+    last = period
+
+  return StreakState(live_streak(last, run, cutoff), best, last, run)
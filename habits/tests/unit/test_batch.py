@@ -0,0 +1,59 @@
+import random
+import pytest
+from datetime import datetime
+from habits.batch import batch_streaks, period_ordinals, recompute_streaks
+from habits.models import Habit
+from habits.streaks import period_ordinal
+from habits.tests.reference import scan_streaks
+
+pytestmark = pytest.mark.django_db
+
+def test_period_ordinals_match_scalar_version():
+  """
+  Test that the vectorized period ordinals match streaks.period_ordinal().
+  """
+  dates = [datetime(2020, 12, 31, 23, 59), datetime(2021, 1, 4), datetime(2025, 3, 9, 12)]
+
+  for occurrence in ["daily", "weekly", "monthly"]:
+    assert period_ordinals(occurrence, [d.toordinal() for d in dates]).tolist() == [period_ordinal(occurrence, d) for d in dates]
+
+def test_batch_streaks_match_single_habit_kernel():
+  """
+  Test that the batch engine agrees with the reference kernel for every habit.
+  """
+  rng = random.Random(7)
+  histories = {habit_id: [rng.randrange(100, 160) for _ in range(rng.randrange(1, 40))] for habit_id in range(1, 30)}
+  ids = [habit_id for habit_id, periods in histories.items() for _ in periods]
+  periods = [p for history in histories.values() for p in history]
+
+  for cutoff in [None, 150]:
+    result = batch_streaks(ids, periods, cutoff)
+    expected = {h: scan_streaks(sorted(p), cutoff) for h, p in histories.items()}
+    expected = {h: state for h, state in expected.items() if state.last_period is not None}
+
+    assert result.habit_ids.tolist() == sorted(expected)
+    for i, habit_id in enumerate(result.habit_ids.tolist()):
+      state = expected[habit_id]
+      assert (result.current[i], result.best[i], result.last_period[i], result.run[i]) == tuple(state)
+
+def test_batch_streaks_empty():
+  """
+  Test that no completions give empty results.
+  """
+  assert len(batch_streaks([], []).habit_ids) == 0
+
+def test_recompute_streaks_updates_all_habits(multiple_habits):
+  """
+  Test that recomputing in bulk stores the same runs and streaks as a rebuild per habit.
+  """
+  assert recompute_streaks() == len(multiple_habits)
+
+  for habit in multiple_habits:
+    stored = Habit.objects.get(habit_id=habit.habit_id)
+    runs = list(habit.streak_runs.values_list("run_start_period", "run_end_period", "run_length").order_by("run_start_period"))
+    habit.rebuild_streaks()
+
+    assert runs == list(habit.streak_runs.values_list("run_start_period", "run_end_period", "run_length").order_by("run_start_period"))
+
+    assert (stored.habit_last_streak, stored.habit_best_streak, stored.habit_last_period, stored.habit_run_streak) == \
+      (habit.habit_last_streak, habit.habit_best_streak, habit.habit_last_period, habit.habit_run_streak)
@@ -0,0 +1,69 @@
+import pytest
+from datetime import datetime
+from django.core.cache import cache
+from django.urls import reverse
+from habits.chart_cache import VERSION_KEY, cached_chart, data_version
+from habits.models import Habit, Completion, Report
+
+pytestmark = pytest.mark.django_db
+
+def test_cached_chart_builds_once():
+  """
+  Test that a chart is only rendered on a cache miss.
+  """
+  builds = []
+  build = lambda: builds.append(1) or "<div>chart</div>"
+
+  assert cached_chart("test", build, "30d") == "<div>chart</div>"
+  assert cached_chart("test", build, "30d") == "<div>chart</div>"
+  assert len(builds) == 1 # Second call from the cache
+
+  cached_chart("test", build, "90d")
+  assert len(builds) == 2 # Other parameters, other key
+
+def test_signals_bump_data_versions(existing_habit, django_capture_on_commit_callbacks):
+  """
+  Test that saving a completion invalidates the global and the habit's charts, but no other habit's.
+  """
+  other = Habit.objects.create(habit_name="Other")
+  before = (data_version(), data_version(existing_habit.habit_id), data_version(other.habit_id))
+
+  with django_capture_on_commit_callbacks(execute=True):
+    Completion.objects.create(completion_habit_id=existing_habit, completion_date=datetime.now())
+
+  after = (data_version(), data_version(existing_habit.habit_id), data_version(other.habit_id))
+  assert after[0] > before[0]
+  assert after[1] > before[1]
+  assert after[2] == before[2] # Unrelated habit keeps its charts
+
+def test_evicted_version_is_never_reused():
+  """
+  Test that a version lost from the cache restarts beyond every earlier one.
+  """
+  version = data_version()
+  cache.delete(VERSION_KEY)
+
+  assert data_version() > version
+
+def test_chart_data_served_from_cache(client, multiple_habits, monkeypatch, django_capture_on_commit_callbacks):
+  """
+  Test that chart data is computed once, revalidated by ETag, and computed again after a habit changes.
+  """
+  builds = []
+  status_data = Report.status_data
+  monkeypatch.setattr(Report, "status_data", lambda snapshot=None: builds.append(1) or status_data(snapshot))
+  url = reverse("chart_data", args=["status"])
+
+  response = client.get(url)
+  client.get(url)
+  assert len(builds) == 1 # Second response from the cache
+
+  response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+  assert response.status_code == 304 # The browser's copy is still valid
+
+  with django_capture_on_commit_callbacks(execute=True):
+    Habit.objects.create(habit_name="New Habit")
+
+  response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+  assert response.status_code == 200 # Changed data, new ETag
+  assert len(builds) == 2
@@ -0,0 +1,87 @@
+import pytest
+import plotly.graph_objects as go
+from datetime import datetime
+from habits import charts
+from habits.models import Completion, CompletionRollup, Report
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture(autouse=True)
+def fixed_div_id(monkeypatch):
+  """
+  Gives every chart div the same id, so both renderers can be compared byte for byte.
+  """
+  monkeypatch.setattr("uuid.uuid4", lambda: "chart")
+
+def _html(fig):
+  """
+  Renders a plotly.graph_objects figure the way the charts used to be rendered.
+  """
+  return fig.to_html(include_plotlyjs=False, full_html=False)
+
+def test_trend_chart_matches_graph_objects(multiple_habits):
+  """
+  Test that the trend chart is identical to the one built with plotly.graph_objects.
+  """
+  CompletionRollup.rebuild()
+  data = Report.completion_trend_data()
+
+  fig = go.Figure()
+  fig.add_trace(go.Scatter(x=data["x"], y=data["y"], mode="lines+markers", name="Completions"))
+  fig.update_layout(title="Habit Completion Trends", xaxis_title=data["bucket"].capitalize(), yaxis_title="Completions")
+
+  assert Report.generate_completion_trend_chart() == _html(fig)
+
+def test_status_chart_matches_graph_objects(multiple_habits):
+  """
+  Test that the status chart is identical to the one built with plotly.graph_objects.
+  """
+  data = Report.status_data()
+
+  fig = go.Figure(data=[go.Pie(labels=data["labels"], values=data["values"], marker=dict(colors=["#4CAF50", "#FFC107", "#F44336"]))])
+  fig.update_layout(title="Habit Status Breakdown")
+
+  assert Report.generate_status_chart() == _html(fig)
+
+def test_streak_chart_matches_graph_objects(multiple_habits):
+  """
+  Test that the streak chart is identical to the one built with plotly.graph_objects.
+  """
+  data = Report.streak_data()
+
+  fig = go.Figure()
+  fig.add_trace(go.Bar(x=data["habits"], y=data["best"], name="Best Streak", marker_color="#007BFF"))
+  fig.add_trace(go.Bar(x=data["habits"], y=data["current"], name="Current Streak", marker_color="#34A853"))
+  fig.update_layout(title="Habit Streak Trends", xaxis_title="Habits", yaxis_title="Number of Days", barmode="group")
+
+  assert Report.generate_streak_chart() == _html(fig)
+
+@pytest.mark.parametrize("occurrence", ["daily", "weekly", "monthly", "yearly"])
+def test_completion_chart_matches_graph_objects(existing_habit, occurrence):
+  """
+  Test that the completion history chart is identical to the one built with plotly.graph_objects.
+  """
+  Completion.objects.create(completion_habit_id=existing_habit, completion_date=datetime(2025, 3, 13))
+  completions = existing_habit.completions.all()
+
+  fig = go.Figure()
+  fig.add_trace(go.Bar(x=["2025-03-13" if occurrence in ("daily", "yearly") else completions[0].completion_date.strftime(
+    "Week %W, %Y" if occurrence == "weekly" else "%B %Y"
+  )], y=[1], marker_color="blue"))
+  fig.update_layout(
+    title="Completion History for Morning Workout", xaxis_title="Period", yaxis_title="Completions", height=300,
+    yaxis=dict(tickvals=[1], ticktext=["✔"]) if occurrence != "yearly" else None
+  )
+
+  assert Report.generate_completion_chart(completions, "Morning Workout", occurrence) == _html(fig)
+
+def test_layout_normalizes_titles():
+  """
+  Test that plain string titles are expanded as plotly's validators would.
+  """
+  layout = charts.layout(title="T", xaxis={"title": "X", "tickvals": [1]}, height=None)
+
+  assert layout["title"] == {"text": "T"}
+  assert layout["xaxis"] == {"title": {"text": "X"}, "tickvals": [1]}
+  assert "height" not in layout # None is left out
+  assert list(layout)[0] == "template"
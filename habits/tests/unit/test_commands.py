@@ -0,0 +1,87 @@
+import pytest
+from datetime import date, datetime, timedelta
+from io import StringIO
+from django.core.management import call_command
+from habits.models import Habit, Completion, CompletionRollup
+
+pytestmark = pytest.mark.django_db
+
+def test_recompute_streaks_command(multiple_habits):
+  """
+  Test that the command repairs stale streaks in chunks.
+  """
+  Habit.objects.update(habit_best_streak=99, habit_last_period=None)
+  out = StringIO()
+
+  call_command("recompute_streaks", workers=1, chunk_size=2, stdout=out)
+
+  evening_run = Habit.objects.get(habit_name="Evening Run")
+  assert evening_run.habit_best_streak == 2 # Recomputed from the completions
+  assert evening_run.habit_last_streak == 2
+  assert evening_run.habit_last_period is not None
+  assert f"{len(multiple_habits)}/{len(multiple_habits)} habits" in out.getvalue() # Progress reported
+
+def test_recompute_streaks_command_repairs_runs():
+  """
+  Test that the command also repairs the streak runs the streaks are read from.
+  """
+  habit = Habit.objects.create(habit_name="Read", habit_occurrence="daily", habit_status="active")
+  today = datetime.now()
+  for days in range(5):
+    Completion.objects.create(completion_habit_id=habit, completion_date=today - timedelta(days=days))
+  Completion.objects.filter(completion_habit_id=habit, completion_day=today.toordinal() - 2).update(completion_deleted=True)  # Bypasses the runs
+
+  call_command("recompute_streaks", workers=1, stdout=StringIO())
+
+  habit = Habit.objects.get(habit_id=habit.habit_id)
+  assert habit.habit_last_streak == 2
+  assert habit.get_current_streak() == 2 # Read from the repaired runs
+  assert habit.get_best_streak() == 2
+  assert habit.streak_runs.count() == 2
+
+def test_recompute_streaks_command_filters_and_dry_run(multiple_habits):
+  """
+  Test that --dry-run saves nothing and the filters limit the habits.
+  """
+  Habit.objects.update(habit_best_streak=99)
+  out = StringIO()
+
+  call_command("recompute_streaks", workers=1, occurrence="weekly", status="active", dry_run=True, stdout=out)
+
+  assert not Habit.objects.exclude(habit_best_streak=99).exists() # Nothing saved
+  assert "Recomputed 1 habit(s)" in out.getvalue() # Only Weekly Yoga
+  assert "would change 1" in out.getvalue()
+
+def test_rebuild_rollups_command(multiple_habits):
+  """
+  Test that the command aggregates the live completions per bucket.
+  """
+  out = StringIO()
+
+  call_command("rebuild_rollups", stdout=out)
+
+  days = CompletionRollup.objects.filter(rollup_granularity="day")
+  assert sum(days.values_list("rollup_count", flat=True)) == 22 # Every live completion counted once
+  assert "rollup row(s)" in out.getvalue()
+
+def test_roll_streaks_command(db):
+  """
+  Test that only active daily streaks whose previous day went uncompleted are zeroed.
+  """
+  today = date(2025, 3, 13)
+  day = today.toordinal()
+  kept = [
+    Habit.objects.create(habit_name="Done today", habit_last_period=day, habit_run_streak=3, habit_last_streak=3),
+    Habit.objects.create(habit_name="Done yesterday", habit_last_period=day - 1, habit_run_streak=2, habit_last_streak=2),
+    Habit.objects.create(habit_name="Paused", habit_status="paused", habit_last_period=day - 9, habit_last_streak=4),
+    Habit.objects.create(habit_name="Weekly", habit_occurrence="weekly", habit_last_period=0, habit_last_streak=5),
+  ]
+  broken = Habit.objects.create(habit_name="Missed", habit_last_period=day - 2, habit_run_streak=6, habit_last_streak=6)
+  out = StringIO()
+
+  call_command("roll_streaks", "--date", today.isoformat(), stdout=out)
+
+  broken.refresh_from_db()
+  assert broken.habit_last_streak == 0 and broken.habit_run_streak == 6 # The run is kept for backdated completions
+  assert [Habit.objects.get(pk=h.pk).habit_last_streak for h in kept] == [3, 2, 4, 5]
+  assert "Reset 1 broken streak(s)" in out.getvalue()
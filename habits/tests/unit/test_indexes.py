@@ -0,0 +1,108 @@
+import pytest
+from habits.models import Habit, Completion
+from habits.pagination import SORTS, _after
+
+pytestmark = pytest.mark.django_db
+
+def assert_uses_index(queryset, index_name):
+  """
+  Asserts that SQLite's EXPLAIN QUERY PLAN for the queryset uses the index.
+  """
+  plan = queryset.explain()
+  assert f"INDEX {index_name}" in plan, plan
+
+def paginate_query(queryset, sort, cursor):
+  """
+  Returns the query of the page after the cursor, as built by pagination.paginate().
+  """
+  field, descending = SORTS[sort]
+  ordering = [f"-{field}", "-habit_id"] if descending else [field, "habit_id"]
+  return _after(queryset, field, *cursor, descending).order_by(*ordering)[:26]
+
+def test_habit_completions_use_partial_index(existing_habit):
+  """
+  Test that a habit's non-deleted completions in date order are read from the partial index.
+  """
+  completions = Completion.objects.filter(completion_habit_id=existing_habit, completion_deleted=False)
+
+  assert_uses_index(completions.order_by("-completion_date"), "completion_live_habit_date_idx") # habit_detail
+  assert_uses_index(Completion.objects.filter(completion_deleted=False), "completion_live_habit_date_idx") # Completion counts
+
+def test_streak_kernel_uses_day_index(existing_habit):
+  """
+  Test that the streak kernel reads the day ordinals from the unique day index.
+  """
+  days = existing_habit.completions.filter(completion_deleted=False).order_by("completion_day").values_list("completion_day")
+
+  assert_uses_index(days, "unique_live_completion_per_day")
+
+def test_active_completions_count_uses_indexes():
+  """
+  Test that counting the completions of active habits is index-only.
+  """
+  completions = Completion.objects.filter(completion_deleted=False, completion_habit_id__habit_status="active")
+
+  assert "habits_habit USING COVERING INDEX habit_status_" in completions.explain() # Any index led by the status
+  assert_uses_index(completions, "completion_live_habit_date_idx")
+
+def test_habit_filters_and_streak_sort_use_indexes():
+  """
+  Test that the habit list filters and the streak chart sort use indexes.
+  """
+  assert_uses_index(Habit.objects.filter(habit_status="active", habit_occurrence="daily"), "habit_status_occurrence_idx")
+  assert_uses_index(Habit.objects.filter(habit_occurrence="weekly"), "habit_occurrence_idx")
+  assert_uses_index(Habit.objects.order_by("-habit_best_streak", "habit_id")[:5], "habit_best_streak_idx") # Report.snapshot() top habits
+
+def test_habit_list_pages_use_indexes():
+  """
+  Test that the keyset pages of the habit list are read from an index in sort order.
+  """
+  active = Habit.objects.filter(habit_status="active")
+  after_name = paginate_query(active, "habit_name", ("Read", 3))
+  after_streak = paginate_query(active, "streak", (5, 3))
+
+  assert_uses_index(after_name, "habit_status_name_idx")
+  assert_uses_index(after_streak, "habit_status_best_streak_idx")
+  assert_uses_index(paginate_query(Habit.objects.all(), "habit_name", ("Read", 3)), "habit_name_idx")
+  assert "TEMP B-TREE" not in after_name.explain() + after_streak.explain() # No sort step
+
+def test_history_pages_use_day_index(existing_habit):
+  """
+  Test that the pages of a habit's completion history are read from the live day index in order.
+  """
+  completions = Completion.objects.filter(completion_habit_id=existing_habit, completion_deleted=False)
+  page = _after(completions, "completion_day", 739000, 12, True).order_by("-completion_day", "-completion_id")[:21]
+
+  assert_uses_index(page, "unique_live_completion_per_day")
+  assert "TEMP B-TREE" not in page.explain() # No sort step
+
+def test_roll_streaks_uses_live_streak_index():
+  """
+  Test that the nightly rollover finds the broken streaks from the partial index of running streaks.
+  """
+  broken = Habit.objects.filter(habit_occurrence="daily", habit_status="active", habit_last_streak__gt=0, habit_last_period__lt=739000)
+
+  assert_uses_index(broken, "habit_live_streak_period_idx")
+
+def test_streak_runs_use_indexes(existing_habit):
+  """
+  Test that the latest run of a habit is read from an index.
+  """
+  assert_uses_index(existing_habit.streak_runs.order_by("-run_end_period")[:1], "streak_run_habit_end_idx")
+
+@pytest.mark.parametrize("scope, index_name", [
+  ("all", "habit_best_streak_idx"),
+  ("occurrence:weekly", "habit_occurrence_idx"),
+  ("status:active", "habit_status_best_streak_idx"),
+])
+def test_leaderboards_load_from_indexes(scope, index_name):
+  """
+  Test that every leaderboard scope is loaded from an index when it drops out of the cache.
+  """
+  habits = Habit.objects.all()
+  if scope != "all":
+    field, value = scope.split(":")
+    habits = habits.filter(**{f"habit_{field}": value})
+  top = habits.order_by("-habit_best_streak", "habit_id")[:10]
+
+  assert_uses_index(top, index_name)
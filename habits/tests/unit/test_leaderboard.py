@@ -0,0 +1,111 @@
+import pytest
+import random
+from django.urls import reverse
+from habits.leaderboard import SCOPES, leaderboard
+from habits.models import Habit
+
+pytestmark = pytest.mark.django_db
+
+def fresh(scope):
+  """
+  Returns the leaderboard of a scope as queried from the database, bypassing the cache.
+  """
+  habits = Habit.objects.all()
+  if scope != "all":
+    field, value = scope.split(":")
+    habits = habits.filter(**{f"habit_{field}": value})
+  return [h.habit_id for h in habits.order_by("-habit_best_streak", "habit_id")[:3]]
+
+@pytest.fixture
+def small_boards(settings):
+  """
+  Keeps 3 habits per leaderboard, so that habits drop off full boards.
+  """
+  settings.HABITS_LEADERBOARD_SIZE = 3
+
+def test_leaderboard_reads_are_cached(multiple_habits, django_assert_num_queries):
+  """
+  Test that a leaderboard is queried once and then read from the cache.
+  """
+  with django_assert_num_queries(2):
+    assert [h.habit_name for h in leaderboard()][:3] == ["Weekend Hike", "Museum Visiting", "Swimming"]
+    assert [h.habit_name for h in leaderboard("occurrence:weekly")] == ["Weekend Hike", "Weekly Yoga", "Date Night"]
+
+  with django_assert_num_queries(0):
+    assert len(leaderboard()) == 9
+    assert [h.habit_name for h in leaderboard("occurrence:weekly")] == ["Weekend Hike", "Weekly Yoga", "Date Night"]
+
+def test_saved_habits_move_within_cached_boards(small_boards, multiple_habits, django_capture_on_commit_callbacks, django_assert_num_queries):
+  """
+  Test that a saved habit is moved on the cached boards of its scopes without reloading them.
+  """
+  for scope in SCOPES:
+    leaderboard(scope)
+  habit = multiple_habits[2] # Morning Reading, daily and active
+
+  with django_capture_on_commit_callbacks(execute=True):
+    habit.habit_best_streak = 12
+    habit.save()
+
+  with django_assert_num_queries(0):
+    assert leaderboard()[0] == habit and leaderboard()[0].habit_best_streak == 12
+    assert leaderboard("occurrence:daily")[0] == habit
+    assert leaderboard("status:active")[0] == habit
+    assert habit not in leaderboard("status:paused")
+
+  with django_capture_on_commit_callbacks(execute=True):
+    habit.habit_status = "paused"
+    habit.save()
+
+  assert habit in leaderboard("status:paused") and habit not in leaderboard("status:active")
+  assert [h.habit_id for h in leaderboard("status:active")] == fresh("status:active")
+
+def test_cached_boards_match_queries_after_random_changes(small_boards, multiple_habits, django_capture_on_commit_callbacks):
+  """
+  Test that incrementally maintained boards always equal a fresh query, including habits dropping off full boards.
+  """
+  rng = random.Random(7)
+  habits = list(multiple_habits)
+
+  for step in range(60):
+    for scope in SCOPES:
+      leaderboard(scope)
+
+    with django_capture_on_commit_callbacks(execute=True):
+      action = rng.random()
+      if action < 0.1 and len(habits) > 3:
+        habits.pop(rng.randrange(len(habits))).delete()
+      elif action < 0.2:
+        habits.append(Habit.objects.create(habit_name=f"New {step}", habit_best_streak=rng.randint(0, 12)))
+      else:
+        habit = rng.choice(habits)
+        habit.habit_best_streak = rng.randint(0, 12)
+        habit.habit_status = rng.choice(["active", "paused", "inactive"])
+        habit.habit_occurrence = rng.choice(["daily", "weekly", "monthly"])
+        habit.save()
+
+    for scope in SCOPES:
+      assert [h.habit_id for h in leaderboard(scope)] == fresh(scope), (step, scope)
+
+def test_bulk_updates_invalidate_boards(multiple_habits, django_capture_on_commit_callbacks):
+  """
+  Test that streak changes written with queryset updates drop the cached boards.
+  """
+  board = leaderboard("status:active")
+  Habit.objects.filter(pk=multiple_habits[0].pk).update(habit_last_period=1, habit_run_streak=2, habit_last_streak=2)
+
+  with django_capture_on_commit_callbacks(execute=True):
+    assert Habit.roll_streaks() == 1
+
+  assert leaderboard("status:active") == board # Same habits, reloaded
+  assert next(h for h in leaderboard("status:active") if h == multiple_habits[0]).habit_last_streak == 0
+
+def test_streak_chart_reads_scope(client, multiple_habits):
+  """
+  Test that the streak chart shows the leaderboard of the requested scope, and all habits for unknown scopes.
+  """
+  monthly = client.get(reverse("chart_data", args=["streak"]), {"scope": "occurrence:monthly"}).json()
+  bogus = client.get(reverse("chart_data", args=["streak"]), {"scope": "habit_name:x"}).json()
+
+  assert monthly["habits"] == ["Museum Visiting", "Monthly Workshop"]
+  assert bogus["habits"][0] == "Weekend Hike" and len(bogus["habits"]) == 5
@@ -1,6 +1,7 @@
 import pytest
-from datetime import datetime, timedelta
-from habits.models import Habit, Completion, Report
+from datetime import date, datetime, timedelta
+from django.db import IntegrityError, transaction
+from habits.models import AnalyticsSnapshot, Habit, Completion, CompletionRollup, Report
 
 # Fixtures for creating test data
 pytestmark = pytest.mark.django_db
@@ -109,6 +110,7 @@ def test_mark_habit_completed(habit_fixtures):
   # test_habit = Habit.objects.create(habit_name="Yoga", habit_occurrence="daily", habit_status="active")
   
   now = datetime.now()
+  test_habit.completions.filter(completion_day=now.toordinal()).update(completion_deleted=True)  # Not completed today yet
   Completion.objects.create(completion_habit_id=test_habit, completion_date=now)
   
   assert test_habit.get_current_streak() == 28  # Streak should increase
@@ -159,7 +161,8 @@ def test_daily_streak_multiple_same_day():
   test_habit = Habit.objects.create(habit_name="Meditate", habit_occurrence="daily", habit_status="active")
 
   Completion.objects.create(completion_habit_id=test_habit, completion_date=datetime.now())
-  Completion.objects.create(completion_habit_id=test_habit, completion_date=datetime.now())  # Same day
+  with pytest.raises(IntegrityError), transaction.atomic():
+    Completion.objects.create(completion_habit_id=test_habit, completion_date=datetime.now())  # Same day is rejected
 
   assert test_habit.get_current_streak() == 1  # Only counts once
 
@@ -433,3 +436,273 @@ def test_monthly_streak_break_on_skip():
     Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 3, 5))  # Feb missing
 
     assert habit.get_current_streak() == 1 # Streak should reset to 1
+
+def test_record_completion_extends_streak_without_rebuild(django_assert_num_queries):
+    """
+    Test that a new completion updates the streaks with a single query.
+    """
+    habit = Habit.objects.create(habit_name="Floss", habit_occurrence="daily", habit_status="active")
+    now = datetime.now()
+    for i in range(1, 4):
+        Completion.objects.create(completion_habit_id=habit, completion_date=now - timedelta(days=i))
+    habit.rebuild_streaks()
+
+    Completion.objects.create(completion_habit_id=habit, completion_date=now)
+    with django_assert_num_queries(1):
+        streak = habit.record_completion(now)
+
+    assert streak == 4 # Yesterday's streak extended by today
+    assert habit.habit_run_streak == 4
+    assert habit.habit_best_streak == 4
+    assert habit.habit_last_period == now.toordinal()
+
+def test_record_completion_restarts_after_gap():
+    """
+    Test that a completion after a missed period restarts the streak.
+    """
+    habit = Habit.objects.create(habit_name="Swim", habit_occurrence="weekly", habit_status="active")
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, 6))
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, 13))
+    habit.rebuild_streaks()
+
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 2, 3))
+
+    assert habit.record_completion(datetime(2025, 2, 3)) == 1 # Streak restarted
+    assert habit.habit_best_streak == 2 # Best streak kept
+
+def test_record_backdated_completion_rebuilds():
+    """
+    Test that a backdated completion falls back to a full rebuild.
+    """
+    habit = Habit.objects.create(habit_name="Journal", habit_occurrence="monthly", habit_status="active")
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, 5))
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 3, 5))
+    habit.rebuild_streaks()
+
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 2, 5))  # Fills the gap
+
+    assert habit.record_completion(datetime(2025, 2, 5)) == 3 # Run merged
+    assert habit.habit_run_streak == 3
+
+def test_get_current_streak_reads_and_writes_once(django_assert_num_queries):
+    """
+    Test that the current and best streak are computed with one read and one write.
+    """
+    habit = Habit.objects.create(habit_name="Piano", habit_occurrence="daily", habit_status="active")
+    now = datetime.now()
+    for i in range(10):
+        Completion.objects.create(completion_habit_id=habit, completion_date=now - timedelta(days=i))
+
+    with django_assert_num_queries(2):
+        assert habit.get_current_streak() == 10
+
+    assert habit.habit_best_streak == 10
+
+def test_best_streak_counts_same_week_completions_once():
+    """
+    Test that several completions in one week do not break the best streak.
+    """
+    habit = Habit.objects.create(habit_name="Tea", habit_occurrence="weekly", habit_status="active")
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, 6))
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, 13))
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, 15))
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, 20))
+
+    assert habit.get_best_streak() == 3 # Second completion in the week of Jan 13 counts once
+
+def test_peek_current_streak_is_read_only(django_assert_num_queries):
+    """
+    Test that peeking at a stale streak neither queries nor writes, and the flush stores it.
+    """
+    habit = Habit.objects.create(habit_name="Guitar", habit_occurrence="daily", habit_status="active")
+    now = datetime.now()
+    for i in range(3, 6):
+        Completion.objects.create(completion_habit_id=habit, completion_date=now - timedelta(days=i))
+    Habit.objects.filter(habit_id=habit.habit_id).update(habit_last_period=(now - timedelta(days=3)).toordinal(), habit_run_streak=3, habit_last_streak=3)
+    habit.refresh_from_db()
+
+    with django_assert_num_queries(0):
+        assert habit.peek_current_streak() == 0 # Streak broke two days ago
+
+    habit.refresh_from_db()
+    assert habit.habit_last_streak == 3 # Nothing written yet
+
+    assert Habit.flush_pending_streaks() == 1
+    habit.refresh_from_db()
+    assert habit.habit_last_streak == 0 # Written behind
+
+def test_flush_pending_streaks_skips_habits_completed_since():
+    """
+    Test that a queued streak does not overwrite a completion recorded after the peek.
+    """
+    habit = Habit.objects.create(habit_name="Drums", habit_occurrence="daily", habit_status="active")
+    now = datetime.now()
+    Completion.objects.create(completion_habit_id=habit, completion_date=now - timedelta(days=3))
+    habit.rebuild_streaks()
+
+    assert habit.peek_current_streak() == 0 # Queued as stale
+    Completion.objects.create(completion_habit_id=habit, completion_date=now)
+    habit.record_completion(now)
+
+    Habit.flush_pending_streaks()
+    habit.refresh_from_db()
+    assert habit.habit_last_streak == 1 # Completion kept
+
+def test_completion_rollup_record_and_rebuild(multiple_habits):
+    """
+    Test that the rollup updates done by the model writes and deletes match a full rebuild.
+    """
+    CompletionRollup.rebuild()
+    habit = multiple_habits[2] # Morning Reading, active
+    last_year = datetime.now() - timedelta(days=400)
+
+    Completion.objects.create(completion_habit_id=habit, completion_date=last_year)
+    paused = Habit.objects.get(habit_id=multiple_habits[3].habit_id)
+    paused.habit_status = "inactive"
+    paused.save()
+    Completion.objects.filter(completion_habit_id=multiple_habits[4]).first().delete()
+    Habit.objects.get(habit_id=multiple_habits[0].habit_id).delete()
+
+    incremental = set(CompletionRollup.objects.filter(rollup_count__gt=0).values_list(
+        "rollup_granularity", "rollup_bucket_date", "rollup_habit_status", "rollup_count"
+    ))
+    CompletionRollup.rebuild()
+    rebuilt = set(CompletionRollup.objects.values_list(
+        "rollup_granularity", "rollup_bucket_date", "rollup_habit_status", "rollup_count"
+    ))
+
+    assert incremental == rebuilt
+    assert ("day", last_year.date(), "active", 1) in rebuilt
+
+def test_status_change_moves_rollup_in_few_queries(django_assert_max_num_queries):
+    """
+    Test that pausing a habit with a long history moves its rollup counts with set-based statements.
+    """
+    habit = Habit.objects.create(habit_name="Journal", habit_occurrence="daily", habit_status="active")
+    first = datetime(2023, 1, 1)
+    Completion.objects.bulk_create([
+        Completion(completion_habit_id=habit, completion_date=first + timedelta(days=days), completion_day=first.toordinal() + days)
+        for days in range(730)
+    ])
+    CompletionRollup.rebuild()
+    expected = {
+        (granularity, bucket_date, "paused", count)
+        for granularity, bucket_date, _, count in CompletionRollup.objects.values_list(
+            "rollup_granularity", "rollup_bucket_date", "rollup_habit_status", "rollup_count"
+        )
+    }
+
+    habit.habit_status = "paused"
+    with django_assert_max_num_queries(25): # Not one per bucket, 859 buckets here
+        habit.save()
+
+    assert set(CompletionRollup.objects.filter(rollup_count__gt=0).values_list(
+        "rollup_granularity", "rollup_bucket_date", "rollup_habit_status", "rollup_count"
+    )) == expected
+
+def test_saving_deferred_completion_counts_it_once(existing_habit):
+    """
+    Test that saving a completion loaded without its day fields does not count it again.
+    """
+    completion = Completion.objects.create(completion_habit_id=existing_habit, completion_date=datetime(2025, 3, 13))
+    day = CompletionRollup.objects.filter(rollup_granularity="day", rollup_bucket_date=date(2025, 3, 13))
+
+    Completion.objects.only("pk", "completion_date").get(pk=completion.pk).save()
+    Completion.objects.only("pk").get(pk=completion.pk).save(update_fields=["completion_date"])
+
+    assert day.get().rollup_count == 1
+    assert list(existing_habit.streak_runs.values_list("run_length", flat=True)) == [1]
+
+def test_completion_rollup_buckets():
+    """
+    Test that a day falls into its own day, its Monday and the 1st of its month.
+    """
+    day = datetime(2025, 3, 13).toordinal() # A Thursday
+
+    assert CompletionRollup.bucket_dates(day) == [
+        ("day", datetime(2025, 3, 13).date()),
+        ("week", datetime(2025, 3, 10).date()),
+        ("month", datetime(2025, 3, 1).date()),
+    ]
+
+def test_completion_trend_chart_reads_rollup(django_assert_num_queries):
+    """
+    Test that the trend chart plots one point per day from the rollup.
+    """
+    habit = Habit.objects.create(habit_name="Tea", habit_occurrence="daily", habit_status="active")
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 3, 13, 8))
+    other = Habit.objects.create(habit_name="Coffee", habit_occurrence="daily", habit_status="paused")
+    Completion.objects.create(completion_habit_id=other, completion_date=datetime(2025, 3, 13, 17))
+    CompletionRollup.rebuild()
+
+    with django_assert_num_queries(2): # First day, then the buckets
+        html = Report.generate_completion_trend_chart(today=datetime(2025, 3, 31).date())
+
+    assert '"x":["2025-03-13"]' in html # Two completions, one day
+    assert '"y":[2]' in html
+
+def test_trend_window_caps_points(django_assert_num_queries):
+    """
+    Test that the trend chart buckets are coarsened to stay within the point budget.
+    """
+    today = datetime(2025, 3, 13).date() # A Thursday
+
+    with django_assert_num_queries(0): # Fixed ranges need no query
+        assert Report.trend_window("30d", today=today) == (datetime(2025, 2, 12).date(), "day")
+        assert Report.trend_window("30d", "week", today=today) == (datetime(2025, 2, 10).date(), "week") # Monday
+        assert Report.trend_window("1y", "month", today=today) == (datetime(2024, 3, 1).date(), "month")
+
+    habit = Habit.objects.create(habit_name="Journal", habit_occurrence="daily", habit_status="active")
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2020, 1, 1))
+    CompletionRollup.rebuild()
+
+    assert Report.trend_window("all", "day", today=today) == (None, "week") # 1900 days > 500 points
+    assert Report.trend_window("all", today=datetime(2035, 1, 1).date()) == (None, "month")
+
+def test_completion_trend_chart_range_and_bucket():
+    """
+    Test that the trend chart only plots the buckets in the requested range.
+    """
+    habit = Habit.objects.create(habit_name="Piano", habit_occurrence="daily", habit_status="active")
+    for day in (datetime(2025, 1, 5), datetime(2025, 3, 3), datetime(2025, 3, 12)):
+        Completion.objects.create(completion_habit_id=habit, completion_date=day)
+    CompletionRollup.rebuild()
+
+    html = Report.generate_completion_trend_chart("30d", "month", today=datetime(2025, 3, 13).date())
+
+    assert '"x":["2025-03-01"]' in html # January is out of range
+    assert '"y":[2]' in html
+
+def test_report_snapshot_matches_counters(multiple_habits, django_assert_num_queries):
+    """
+    Test that the snapshot agrees with the individual report counters, in three queries.
+    """
+    old = datetime(2020, 1, 1)
+    Completion.objects.bulk_create([ # Bypasses Completion.save() and the rollup
+        Completion(completion_habit_id=multiple_habits[2], completion_date=old, completion_day=old.toordinal())
+    ])
+
+    with django_assert_num_queries(3):
+        snapshot = Report.snapshot()
+
+    assert isinstance(snapshot, AnalyticsSnapshot)
+    assert (snapshot.active_habits, snapshot.paused_habits, snapshot.inactive_habits) == (3, 3, 3)
+    assert (snapshot.total_completions, snapshot.active_completions, snapshot.other_completions) == Report.habits_completed_count()
+    assert snapshot.max_best_streak == 10
+    assert [h.habit_name for h in snapshot.top_habits] == ["Weekend Hike", "Museum Visiting", "Swimming", "Weekly Yoga", "Date Night"]
+    assert list(snapshot.longest_streak_habits) == list(Report.get_habits_with_longest_streak())
+
+    with pytest.raises(AttributeError): # Frozen
+        snapshot.total_completions = 0
+
+def test_report_snapshot_ties_beyond_top_n():
+    """
+    Test that all habits tied for the longest streak are listed, even beyond the top habits.
+    """
+    for i in range(3):
+        Habit.objects.create(habit_name=f"Tie {i}", habit_best_streak=4)
+
+    snapshot = Report.snapshot(top_n=2)
+
+    assert len(snapshot.top_habits) == 2
+    assert len(snapshot.longest_streak_habits) == 3
@@ -0,0 +1,71 @@
+import pytest
+from habits.models import Habit
+from habits.pagination import decode_cursor, encode_cursor, paginate
+
+pytestmark = pytest.mark.django_db
+
+@pytest.fixture
+def many_habits(db):
+  """
+  Creates 7 habits with duplicate names and streaks, so that ties have to be broken by ID.
+  """
+  return [
+    Habit.objects.create(habit_name=f"Habit {i % 3}", habit_best_streak=i % 4, habit_occurrence="daily")
+    for i in range(7)
+  ]
+
+def walk(queryset, sort, page_size):
+  """
+  Pages forwards through the queryset and returns the pages.
+  """
+  pages = [paginate(queryset, sort, page_size)]
+  while pages[-1].next_cursor:
+    pages.append(paginate(queryset, sort, page_size, after=pages[-1].next_cursor))
+  return pages
+
+def test_cursor_round_trip():
+  """
+  Test that cursors decode to their key and ID, and that malformed cursors are rejected.
+  """
+  assert decode_cursor(encode_cursor("Read", 12)) == ("Read", 12)
+  assert decode_cursor(encode_cursor(5, 3)) == (5, 3)
+  assert decode_cursor("not a cursor") is None
+  assert decode_cursor(encode_cursor(None, 3)) is None
+  assert decode_cursor(encode_cursor("Read", "12")) is None
+
+@pytest.mark.parametrize("sort, ordering", [
+  ("habit_name", ["habit_name", "habit_id"]),
+  ("streak", ["-habit_best_streak", "-habit_id"]),
+  ("habit_occurrence", ["habit_occurrence", "habit_id"]),
+])
+def test_pages_cover_the_sort_order(many_habits, sort, ordering):
+  """
+  Test that paging forwards yields every habit once, in sort order, and that paging back returns the same pages.
+  """
+  habits = Habit.objects.all()
+  pages = walk(habits, sort, 3)
+
+  assert [len(page.items) for page in pages] == [3, 3, 1]
+  assert [h for page in pages for h in page.items] == list(habits.order_by(*ordering))
+  assert pages[0].prev_cursor is None and pages[-1].next_cursor is None
+
+  for previous, page in zip(pages, pages[1:]):
+    assert paginate(habits, sort, 3, before=page.prev_cursor).items == previous.items
+
+def test_page_before_first_row_is_empty(many_habits):
+  """
+  Test that paging back from the first row returns no rows and no previous cursor.
+  """
+  first = paginate(Habit.objects.all(), "habit_name", 3)
+  page = paginate(Habit.objects.all(), "habit_name", 3, before=first.prev_cursor or encode_cursor("Habit 0", 0))
+
+  assert page.items == [] and page.prev_cursor is None
+
+def test_page_query_count_is_constant(many_habits, django_assert_num_queries):
+  """
+  Test that a deep page costs a single query like the first one.
+  """
+  last = walk(Habit.objects.all(), "streak", 2)[-1]
+
+  with django_assert_num_queries(1):
+    paginate(Habit.objects.all(), "streak", 2, after=last.prev_cursor)
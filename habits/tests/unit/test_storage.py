@@ -0,0 +1,43 @@
+import gzip
+import json
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from habits.models import Report
+
+pytestmark = pytest.mark.django_db
+
+def test_charts_do_not_inline_plotly(multiple_habits):
+  """
+  Test that the chart fragments contain only the div and the figure JSON, not plotly.js.
+  """
+  for html in [Report.generate_status_chart(), Report.generate_streak_chart(), Report.generate_completion_trend_chart()]:
+    assert "plotly.js v" not in html # Library not embedded
+    assert len(html) < 20_000
+
+def test_analytics_page_loads_vendored_plotly(client, multiple_habits):
+  """
+  Test that the analytics page stays small and loads plotly.js from the static files.
+  """
+  response = client.get(reverse("analytics"))
+
+  assert b"/static/habits/vendor/plotly-2.8.3.min.js" in response.content
+  assert b"cdn.plot.ly" not in response.content # Works offline
+  assert len(response.content) < 100_000
+
+def test_collectstatic_writes_hashed_and_compressed_files(settings, tmp_path):
+  """
+  Test that collectstatic stores hashed copies with a manifest and gzip variants.
+  """
+  settings.STATIC_ROOT = tmp_path
+  settings.STORAGES = {**settings.STORAGES, "staticfiles": {"BACKEND": "habits.storage.CompressedManifestStaticFilesStorage"}}
+
+  call_command("collectstatic", interactive=False, verbosity=0)
+
+  manifest = json.loads((tmp_path / "staticfiles.json").read_text())
+  hashed = tmp_path / manifest["paths"]["habits/vendor/plotly-2.8.3.min.js"]
+  compressed = hashed.with_name(hashed.name + ".gz")
+
+  assert hashed.name != "plotly-2.8.3.min.js" # Content hash in the name
+  assert compressed.stat().st_size < hashed.stat().st_size
+  assert gzip.decompress(compressed.read_bytes()) == hashed.read_bytes()
@@ -0,0 +1,88 @@
+import pytest
+from datetime import date, datetime, timedelta
+from django.urls import reverse
+from habits.models import Habit, Completion
+from habits.streak_cache import seconds_until_boundary
+from habits.streaks import next_period_start
+
+pytestmark = pytest.mark.django_db
+
+@pytest.mark.parametrize("occurrence, today, boundary", [
+  ("daily", date(2025, 3, 13), date(2025, 3, 14)),
+  ("weekly", date(2025, 3, 13), date(2025, 3, 17)), # Thursday, next Monday
+  ("weekly", date(2025, 3, 17), date(2025, 3, 24)), # Monday, the one after
+  ("monthly", date(2025, 3, 13), date(2025, 4, 1)),
+  ("monthly", date(2025, 12, 31), date(2026, 1, 1)),
+])
+def test_next_period_start(occurrence, today, boundary):
+  """
+  Test that the next period starts at midnight, on the ISO Monday or on the 1st.
+  """
+  assert next_period_start(occurrence, today) == boundary
+
+def test_seconds_until_boundary():
+  """
+  Test that cached streaks expire at the next boundary, and never without a timeout.
+  """
+  assert seconds_until_boundary("daily", datetime(2025, 3, 13, 23, 0)) == 3600
+  assert seconds_until_boundary("weekly", datetime(2025, 3, 16, 12, 0)) == 12 * 3600
+  assert seconds_until_boundary("daily", datetime(2025, 3, 13, 23, 59, 59, 999999)) == 1
+
+def test_current_streak_is_cached(existing_habit, django_assert_num_queries):
+  """
+  Test that only the first read of the current streak in a period scans the completions.
+  """
+  now = datetime.now()
+  for days in range(3):
+    Completion.objects.create(completion_habit_id=existing_habit, completion_date=now - timedelta(days=days))
+  habit = Habit.objects.get(pk=existing_habit.pk)
+
+  assert habit.get_current_streak() == 3
+  with django_assert_num_queries(0):
+    assert habit.get_current_streak() == 3
+    assert habit.current_streak == 3
+
+def test_cached_streak_follows_data_changes(existing_habit, django_capture_on_commit_callbacks):
+  """
+  Test that deleting a completion invalidates the habit's cached streak.
+  """
+  now = datetime.now()
+  with django_capture_on_commit_callbacks(execute=True):
+    completions = [
+      Completion.objects.create(completion_habit_id=existing_habit, completion_date=now - timedelta(days=days))
+      for days in range(3)
+    ]
+  habit = Habit.objects.get(pk=existing_habit.pk)
+  assert habit.get_current_streak() == 3
+
+  with django_capture_on_commit_callbacks(execute=True):
+    completions[1].completion_deleted = True
+    completions[1].save()
+
+  assert Habit.objects.get(pk=existing_habit.pk).get_current_streak() == 1
+
+def test_habit_list_shows_cached_streaks(client, existing_habit):
+  """
+  Test that the habit list shows the live streak rather than a stale stored one.
+  """
+  Habit.objects.filter(pk=existing_habit.pk).update(
+    habit_last_period=(date.today() - timedelta(days=3)).toordinal(), habit_run_streak=4, habit_last_streak=4
+  )
+
+  response = client.get(reverse("habit_list"))
+
+  assert [habit.current_streak for habit in response.context["habits"]] == [0] # Broke two days ago
+
+def test_displayed_streak_does_not_fill_the_cache(existing_habit):
+  """
+  Test that a stale stored streak read for display is not served to get_current_streak().
+  """
+  now = datetime.now()
+  for days in range(2):
+    Completion.objects.create(completion_habit_id=existing_habit, completion_date=now - timedelta(days=days))
+  Habit.objects.filter(pk=existing_habit.pk).update(habit_last_period=None, habit_run_streak=0, habit_last_streak=7)
+  habit = Habit.objects.get(pk=existing_habit.pk)
+
+  assert habit.current_streak == 7 # Unknown counters fall back to the stored streak
+  assert habit.get_current_streak() == 2 # Computed from the runs, not the displayed value
+  assert habit.habit_last_period == now.toordinal()
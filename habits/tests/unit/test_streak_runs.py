@@ -0,0 +1,160 @@
+import pytest
+from datetime import date, datetime
+from django.urls import reverse
+from habits.models import Habit, Completion, Report, StreakRun
+from habits.streaks import period_runs
+from habits.tests.reference import scan_streaks
+
+pytestmark = pytest.mark.django_db
+
+def runs(habit):
+  """
+  Returns the (start, end) dates of a habit's streak runs, oldest first.
+  """
+  return [(run.start_date, run.end_date) for run in habit.streak_runs.order_by("run_start_period")]
+
+def store_periods(habit, periods):
+  """
+  Stores the runs of the given sorted period ordinals for the habit, without completions.
+  """
+  StreakRun.store([habit.habit_id], ((habit.habit_id, start, end) for start, end in period_runs(periods)))
+
+def complete(habit, *days):
+  """
+  Completes the habit on each of the days of March 2025.
+  """
+  return [Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 3, day)) for day in days]
+
+def test_completions_extend_and_merge_runs(existing_habit):
+  """
+  Test that a backdated completion filling a gap merges the two runs around it.
+  """
+  complete(existing_habit, 1, 2, 4, 5)
+  assert runs(existing_habit) == [(date(2025, 3, 1), date(2025, 3, 2)), (date(2025, 3, 4), date(2025, 3, 5))]
+
+  complete(existing_habit, 3)
+  assert runs(existing_habit) == [(date(2025, 3, 1), date(2025, 3, 5))]
+  assert existing_habit.streak_runs.get().run_length == 5
+
+def test_deleting_and_restoring_splits_and_merges_runs(existing_habit):
+  """
+  Test that soft-deleting a completion splits its run and restoring it merges the run again.
+  """
+  completions = complete(existing_habit, 1, 2, 3, 4)
+
+  completions[1].completion_deleted = True
+  completions[1].save()
+  assert runs(existing_habit) == [(date(2025, 3, 1), date(2025, 3, 1)), (date(2025, 3, 3), date(2025, 3, 4))]
+
+  completions[0].completion_deleted = True
+  completions[0].save()
+  assert runs(existing_habit) == [(date(2025, 3, 3), date(2025, 3, 4))]
+
+  restored = Completion.objects.get(pk=completions[1].pk) # Loaded from the database, as the views do
+  restored.completion_deleted = False
+  restored.save(update_fields=["completion_deleted"])
+  assert runs(existing_habit) == [(date(2025, 3, 2), date(2025, 3, 4))]
+
+def test_hard_deletes_split_runs(existing_habit):
+  """
+  Test that hard-deleting a live completion, e.g. from the admin, also splits its run.
+  """
+  completions = complete(existing_habit, 1, 2, 3)
+
+  completions[1].delete()
+  assert runs(existing_habit) == [(date(2025, 3, 1), date(2025, 3, 1)), (date(2025, 3, 3), date(2025, 3, 3))]
+
+  Completion.objects.filter(completion_habit_id=existing_habit).delete()
+  assert runs(existing_habit) == []
+
+def test_weekly_period_stays_while_completed(existing_habit):
+  """
+  Test that a week stays in its run while another completion of the week is live.
+  """
+  existing_habit.habit_occurrence = "weekly"
+  existing_habit.save()
+  completions = complete(existing_habit, 3, 5, 10)
+
+  completions[0].completion_deleted = True
+  completions[0].save()
+  assert runs(existing_habit) == [(date(2025, 3, 3), date(2025, 3, 16))] # Mar 5 still completes the week
+
+  completions[1].completion_deleted = True
+  completions[1].save()
+  assert runs(existing_habit) == [(date(2025, 3, 10), date(2025, 3, 16))]
+
+def test_occurrence_change_rebuilds_runs(existing_habit):
+  """
+  Test that the runs are recounted in the new periods when the occurrence changes.
+  """
+  complete(existing_habit, 1, 3, 10)
+  assert len(runs(existing_habit)) == 3
+
+  existing_habit.habit_occurrence = "monthly"
+  existing_habit.save()
+
+  assert runs(existing_habit) == [(date(2025, 3, 1), date(2025, 3, 31))]
+
+def test_state_cuts_future_runs_off(existing_habit):
+  """
+  Test that the streak counters read from the runs ignore periods after the cutoff, as the kernel does.
+  """
+  complete(existing_habit, 1, 2, 3, 5, 6, 7, 8, 9)
+  cutoff = date(2025, 3, 6).toordinal()
+
+  state = StreakRun.state(existing_habit, cutoff)
+
+  assert (state.current, state.best, state.last_period, state.run) == (2, 3, cutoff, 2)
+  assert StreakRun.state(existing_habit).best == 5
+  assert state == scan_streaks([date(2025, 3, day).toordinal() for day in (1, 2, 3, 5, 6, 7, 8, 9)], cutoff) # Same as the reference kernel
+
+def test_state_returns_current_and_best(existing_habit):
+  """
+  Test that one read of the runs gives both the current and the best streak.
+  """
+  store_periods(existing_habit, [1, 2, 3, 3, 5, 6, 8, 9, 10, 11, 13, 14])
+
+  assert StreakRun.state(existing_habit) == (2, 4, 14, 2) # Current 13 and 14, best 8 to 11
+
+def test_state_respects_cutoff(existing_habit):
+  """
+  Test that future periods are ignored and a missed period breaks the current streak.
+  """
+  store_periods(existing_habit, [7, 8, 9, 12])
+  assert StreakRun.state(existing_habit, cutoff=10).current == 3 # Day 12 is in the future
+
+  store_periods(existing_habit, [7, 8])
+  assert StreakRun.state(existing_habit, cutoff=10).current == 0 # Day 9 was missed
+  assert StreakRun.state(existing_habit, cutoff=10).best == 2
+
+  store_periods(existing_habit, [])
+  assert StreakRun.state(existing_habit, cutoff=10) == (0, 0, None, 0) # No completions, no streaks
+
+def test_best_streak_and_longest_habits_read_runs(existing_habit, django_assert_num_queries):
+  """
+  Test that the best streak comes from the runs, without reading completions, and ranks the longest habits.
+  """
+  other = Habit.objects.create(habit_name="Other")
+  complete(existing_habit, 1, 2, 3)
+  complete(other, 1, 2, 3, 4)
+
+  with django_assert_num_queries(1):
+    assert other.get_best_streak() == 4
+  existing_habit.refresh_streaks()
+  other.refresh_streaks()
+  assert list(Report.get_habits_with_longest_streak()) == [other] # Ranked by the stored best streak
+
+  StreakRun.objects.all().delete()
+  assert StreakRun.rebuild() == 2 # Repair from the completions
+  assert existing_habit.get_best_streak() == 3
+
+def test_habit_detail_shows_streak_timeline(client, existing_habit):
+  """
+  Test that the detail page lists the habit's latest streak runs.
+  """
+  complete(existing_habit, 1, 2, 3, 10)
+
+  response = client.get(reverse("habit_detail", args=[existing_habit.habit_id]))
+
+  assert b"2025-03-01 \xe2\x86\x92 2025-03-03: 3 days" in response.content
+  assert [run.run_length for run in response.context["streak_runs"]] == [1, 3]
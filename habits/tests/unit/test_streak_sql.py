@@ -0,0 +1,57 @@
+import random
+import pytest
+from datetime import datetime, timedelta
+from habits.models import Habit, Completion, Report, StreakRun
+from habits.streak_sql import sql_streaks
+from habits.streaks import cutoff_period
+
+pytestmark = pytest.mark.django_db
+
+def _random_habit(rng, occurrence):
+  """
+  Creates a habit with random completions around today, some deleted.
+  """
+  habit = Habit.objects.create(habit_name=f"Random {occurrence}", habit_occurrence=occurrence, habit_status="active")
+  step = {"daily": 1, "weekly": 7, "monthly": 30}[occurrence]
+  now = datetime.now()
+
+  offsets = {rng.randrange(-2, 20) * step for _ in range(rng.randrange(0, 25))}
+  for days in offsets:
+    Completion.objects.create(
+      completion_habit_id=habit,
+      completion_date=(now - timedelta(days=days)).replace(hour=rng.randrange(0, 24)),
+      completion_deleted=rng.random() < 0.1
+    )
+  return habit
+
+def test_sql_streaks_match_python_kernel():
+  """
+  Test that the gaps-and-islands query agrees with the streak runs for every occurrence.
+  """
+  rng = random.Random(3)
+  habits = [_random_habit(rng, occurrence) for occurrence in ["daily", "weekly", "monthly"] * 5]
+  streaks = sql_streaks()
+
+  for habit in habits:
+    state = StreakRun.state(habit, cutoff_period(habit.habit_occurrence))
+    assert streaks.get(habit.habit_id, (0, 0)) == (state.current, state.best)
+
+def test_sql_streaks_for_one_habit(habit_fixtures):
+  """
+  Test that a single habit can be computed on its own.
+  """
+  habit = habit_fixtures[0]  # 28-day daily streak
+
+  assert sql_streaks(habit.habit_id) == {habit.habit_id: (28, 28)}
+
+def test_sql_backend_for_best_and_longest_streak(settings):
+  """
+  Test that the SQL backend can be selected for the best streak.
+  """
+  settings.HABITS_STREAK_BACKEND = "sql"
+  habit = Habit.objects.create(habit_name="Read", habit_occurrence="daily", habit_status="active")
+  for day in [1, 2, 4, 5, 6]:
+    Completion.objects.create(completion_habit_id=habit, completion_date=datetime(2025, 1, day))
+
+  assert habit.get_best_streak() == 3 # Jan 4 to Jan 6
+  assert Report.get_longest_streak(habit.habit_id) == 3
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from habits.streaks import period_ordinal, cutoff_period, extend_run, live_streak, scan_streak_series
+from habits.tests.reference import scan_streaks
+
+def test_weekly_periods_are_consecutive_across_53_week_years():
+  """
+  Test that ISO weeks stay consecutive across a year with 53 weeks.
+  """
+  last_week_2020 = period_ordinal("weekly", date(2020, 12, 31))  # ISO week 53
+  first_week_2021 = period_ordinal("weekly", date(2021, 1, 4))  # ISO week 1
+
+  assert first_week_2021 == last_week_2020 + 1 # Consecutive weeks
+  assert period_ordinal("weekly", date(2025, 3, 3)) == period_ordinal("weekly", date(2025, 3, 9)) # Monday to Sunday
+
+def test_monthly_periods_are_consecutive_across_years():
+  """
+  Test that December and January are consecutive months.
+  """
+  assert period_ordinal("monthly", datetime(2025, 1, 31, 23, 59)) == period_ordinal("monthly", date(2024, 12, 1)) + 1
+
+def test_cutoff_only_applies_to_daily():
+  """
+  Test that only daily streaks lapse with the calendar.
+  """
+  today = date(2025, 3, 10)
+
+  assert cutoff_period("daily", today) == today.toordinal()
+  assert cutoff_period("weekly", today) is None
+  assert cutoff_period("monthly", today) is None
+
+def test_extend_run():
+  """
+  Test advancing a run by one period.
+  """
+  assert extend_run(10, 3, 10) == 3 # Same period
+  assert extend_run(10, 3, 11) == 4 # Consecutive period
+  assert extend_run(10, 3, 13) == 1 # Gap restarts the streak
+  assert extend_run(10, 3, 9) is None # Backdated needs a rebuild
+
+def test_live_streak():
+  """
+  Test that a run is only current if the previous period was completed.
+  """
+  assert live_streak(None, 0, 100) == 0 # No completions
+  assert live_streak(99, 4, 100) == 4 # Completed yesterday
+  assert live_streak(98, 4, 100) == 0 # Missed yesterday
+  assert live_streak(5, 4, None) == 4 # Never lapses
+
+def test_streak_series_matches_scan_per_period():
+  """
+  Test that the one-pass series agrees with scanning the history as of every period.
+  """
+  periods = [3, 4, 4, 5, 7, 8, 11, 12, 13, 14]
+
+  current, best = scan_streak_series(periods, 0, 16)
+
+  assert current == [scan_streaks(periods, cutoff).current for cutoff in range(17)]
+  assert best == [scan_streaks(periods, cutoff).best for cutoff in range(17)]
+
+def test_streak_series_window_and_no_decay():
+  """
+  Test that periods before the window still count and that weekly and monthly streaks do not decay.
+  """
+  current, best = scan_streak_series([1, 2, 3, 6], 5, 9, decays=False)
+
+  assert current == [3, 1, 1, 1, 1] # Kept through the gap, restarted at 6
+  assert best == [3] * 5
+  assert scan_streak_series([], 5, 4) == ([], []) # Empty window
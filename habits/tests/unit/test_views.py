@@ -1,7 +1,9 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from datetime import datetime, timedelta
-from habits.models import Habit, Completion
+from datetime import date, datetime, timedelta
+from habits.models import Habit, Completion, CompletionRollup, Report
 
 pytestmark = pytest.mark.django_db
 
@@ -106,6 +108,16 @@ def test_analytics_view_renders_successfully(client):
   assert response.status_code == 200 # Should return 200 OK
   assert b"Analytics Dashboard" in response.content or b"Longest Run Streak" in response.content # Check if the page is loaded
 
+def test_analytics_view_does_not_write(client, multiple_habits):
+  """
+  Test that rendering the analytics page issues no UPDATE statements.
+  """
+  with CaptureQueriesContext(connection) as queries:
+    response = client.get(reverse("analytics"))
+
+  assert response.status_code == 200 # Should return 200 OK
+  assert not [q["sql"] for q in queries if q["sql"].startswith("UPDATE")] # Read-only
+
 # GET Requests and Invalid forms
 def test_create_habit_view_get(client):
   """
@@ -189,4 +201,281 @@ def test_edit_habit_occurrence_resets_streak():
 
   # Since completions are close together, it should reset to 1 (same week)
   assert streak == 1 # Streak should be 1 week
-  assert habit.habit_last_streak == 1 # Last streak should be 1 week
\ No newline at end of file
+  assert habit.habit_last_streak == 1 # Last streak should be 1 week
+
+def test_edit_habit_status_and_occurrence_rebuilds_runs(client):
+  """
+  Test that resuming a habit and changing its occurrence in one edit recounts its runs in the new periods.
+  """
+  habit = Habit.objects.create(habit_name="Swim", habit_occurrence="daily", habit_status="paused")
+  now = datetime.now()
+  for weeks in (2, 1, 0):
+    Completion.objects.create(completion_habit_id=habit, completion_date=now - timedelta(weeks=weeks))
+
+  client.post(reverse("edit_habit", args=[habit.habit_id]), {
+    "habit_name": habit.habit_name,
+    "habit_occurrence": "weekly",
+    "habit_status": "active"
+  })
+
+  week = (now.toordinal() - 1) // 7
+  assert list(habit.streak_runs.values_list("run_start_period", "run_end_period")) == [(week - 2, week)]
+  habit.refresh_from_db()
+  assert habit.habit_last_streak == 3 # Three consecutive weeks
+
+def test_mark_completed_view_extends_streak(client):
+  """
+  Test that marking a habit as completed extends yesterday's streak.
+  """
+  habit = Habit.objects.create(habit_name="Stretch", habit_occurrence="daily", habit_status="active")
+  now = datetime.now()
+  Completion.objects.create(completion_habit_id=habit, completion_date=now - timedelta(days=2))
+  Completion.objects.create(completion_habit_id=habit, completion_date=now - timedelta(days=1))
+
+  client.post(reverse("mark_completed", args=[habit.habit_id]))
+  habit.refresh_from_db()
+
+  assert habit.habit_last_streak == 3 # Streak extended by today
+  assert habit.habit_best_streak == 3 # Best streak updated
+  assert habit.habit_last_period == now.toordinal() # Latest period kept on the habit
+
+def test_mark_completed_view_twice_keeps_one_completion(client):
+  """
+  Test that marking a habit twice on the same day stores a single completion.
+  """
+  habit = Habit.objects.create(habit_name="Plank", habit_occurrence="daily", habit_status="active")
+  url = reverse("mark_completed", args=[habit.habit_id])
+
+  client.post(url)
+  client.post(url)
+
+  assert habit.completions.count() == 1 # Second click does not add a row
+
+def test_mark_completed_view_restores_deleted_completion(client):
+  """
+  Test that completing again restores today's soft-deleted completion.
+  """
+  habit = Habit.objects.create(habit_name="Squats", habit_occurrence="daily", habit_status="active")
+  Completion.objects.create(completion_habit_id=habit, completion_date=datetime.now(), completion_deleted=True)
+
+  client.post(reverse("mark_completed", args=[habit.habit_id]))
+
+  assert habit.completions.count() == 1 # Restored rather than duplicated
+  assert habit.completions.filter(completion_deleted=False).exists()
+
+def test_mark_completed_view_saves_completion_and_streak_together(client, monkeypatch):
+  """
+  Test that a failing streak update also rolls back the completion.
+  """
+  habit = Habit.objects.create(habit_name="Lunges", habit_occurrence="daily", habit_status="active")
+
+  def fail(self, completion_date):
+    raise RuntimeError("Streak update failed")
+  monkeypatch.setattr(Habit, "record_completion", fail)
+
+  with pytest.raises(RuntimeError):
+    client.post(reverse("mark_completed", args=[habit.habit_id]))
+
+  assert not habit.completions.exists() # No completion without its streak
+
+def test_habit_list_view_single_query(client, multiple_habits, django_assert_num_queries):
+  """
+  Test that the habit list runs one query however many habits and completions exist.
+  """
+  with django_assert_num_queries(1):
+    response = client.get(reverse("habit_list"), {"filter_by_status": "all"})
+
+  assert response.status_code == 200 # Should return 200 OK
+  assert response.content.count(b"fa-circle-check") == 3 # Active habits completed today are green
+
+def test_habit_list_view_pages_with_cursors(client, settings):
+  """
+  Test that the habit list is paged, and that the next and previous links keep the filters and sort.
+  """
+  settings.HABITS_PAGE_SIZE = 2
+  for name in ["Alpha", "Bravo", "Charlie", "Delta", "Echo"]:
+    Habit.objects.create(habit_name=name, habit_status="active")
+
+  first = client.get(reverse("habit_list"), {"sort_by": "habit_name"})
+  assert [h.habit_name for h in first.context["habits"]] == ["Alpha", "Bravo"]
+  assert first.context["prev_url"] is None
+  assert "sort_by=habit_name" in first.context["next_url"]
+
+  second = client.get(reverse("habit_list") + first.context["next_url"])
+  assert [h.habit_name for h in second.context["habits"]] == ["Charlie", "Delta"]
+
+  back = client.get(reverse("habit_list") + second.context["prev_url"])
+  assert [h.habit_name for h in back.context["habits"]] == ["Alpha", "Bravo"]
+
+def test_habit_list_view_rejects_unknown_sort_and_page_size(client, multiple_habits):
+  """
+  Test that an unknown sort falls back to the name and that the page size is clamped.
+  """
+  response = client.get(reverse("habit_list"), {"sort_by": "habit_description", "page_size": "1", "filter_by_status": "all"})
+
+  assert response.status_code == 200 # Should not raise on unknown fields
+  assert response.context["sort_by"] == "habit_name"
+  assert len(response.context["habits"]) == 1
+
+  response = client.get(reverse("habit_list"), {"page_size": "lots", "after": "garbage"})
+  assert response.status_code == 200 # Invalid values fall back to the defaults
+
+def test_completion_writes_maintain_rollup(client, multiple_habits):
+  """
+  Test that completing, pausing and deleting a habit keep the rollup in step with the completions.
+  """
+  CompletionRollup.rebuild()
+  habit = Habit.objects.create(habit_name="Stretch", habit_occurrence="daily", habit_status="active")
+  today = datetime.now().date()
+
+  def day_count(status):
+    bucket = CompletionRollup.objects.filter(rollup_granularity="day", rollup_bucket_date=today, rollup_habit_status=status).first()
+    return bucket.rollup_count if bucket else 0
+
+  active_before = day_count("active")
+  client.get(reverse("mark_completed", args=[habit.habit_id]))
+  assert day_count("active") == active_before + 1 # Counted once
+  client.get(reverse("mark_completed", args=[habit.habit_id]))
+  assert day_count("active") == active_before + 1 # Not twice
+
+  client.post(reverse("edit_habit", args=[habit.habit_id]), {
+    "habit_name": "Stretch", "habit_occurrence": "daily", "habit_status": "paused"
+  })
+  assert day_count("active") == active_before # Moved to paused
+  assert day_count("paused") >= 1
+
+  paused_before = day_count("paused")
+  client.post(reverse("delete_habit", args=[habit.habit_id]))
+  assert day_count("paused") == paused_before - 1 # Removed with the habit
+
+def test_analytics_view_trend_parameters(client, multiple_habits):
+  """
+  Test that the trend chart range and bucket come from the query string, with safe fallbacks.
+  """
+  response = client.get(reverse("analytics"), {"range": "90d", "bucket": "week"})
+  assert response.context["trend_range"] == "90d"
+  assert response.context["trend_bucket"] == "week"
+  assert b"range=90d&amp;bucket=week" in response.content # Passed on to the chart data
+
+  response = client.get(reverse("analytics"), {"range": "forever", "bucket": "hour"})
+  assert response.context["trend_range"] == "all"
+  assert response.context["trend_bucket"] == "auto"
+
+def test_analytics_view_only_computes_counters(client, multiple_habits, django_assert_num_queries):
+  """
+  Test that the analytics page renders its counters without building any chart.
+  """
+  with django_assert_num_queries(3): # Report.snapshot()
+    response = client.get(reverse("analytics"))
+
+  assert response.status_code == 200
+  assert response.content.count(b"data-chart-url=") == 3 # Charts load lazily
+  assert b"Plotly.newPlot" not in response.content
+
+def test_chart_data_returns_columns(client, multiple_habits):
+  """
+  Test that the chart data endpoints return compact column arrays.
+  """
+  CompletionRollup.rebuild()
+
+  trend = client.get(reverse("chart_data", args=["trend"]), {"range": "30d", "bucket": "week"}).json()
+  status = client.get(reverse("chart_data", args=["status"])).json()
+  streak = client.get(reverse("chart_data", args=["streak"])).json()
+
+  assert trend["bucket"] == "week" and len(trend["x"]) == len(trend["y"])
+  assert status == {"labels": ["Active", "Paused", "Inactive"], "values": [3, 3, 3]}
+  assert streak["habits"][0] == "Weekend Hike" and streak["best"][0] == 10
+  assert client.get(reverse("chart_data", args=["bogus"])).status_code == 404
+
+def test_habit_history_data(client, multiple_habits):
+  """
+  Test that a habit's history data counts its completions per bucket over a fixed window.
+  """
+  response = client.get(reverse("habit_history_data", args=[multiple_habits[0].habit_id]))
+
+  data = response.json() # Evening Run, daily
+  assert data["kind"] == "heatmap" and len(data["x"]) == Report.HISTORY_WEEKS and len(data["z"]) == 7
+  assert sum(count or 0 for row in data["z"] for count in row) == 2
+  assert "no-cache" in response["Cache-Control"] and response.has_header("ETag")
+
+@pytest.mark.parametrize("occurrence, bucket, size", [("weekly", "week", 53), ("monthly", "month", 24)])
+def test_habit_history_data_buckets(existing_habit, occurrence, bucket, size):
+  """
+  Test that weekly and monthly habits are counted per week and month, and that older completions are left out.
+  """
+  existing_habit.habit_occurrence = occurrence
+  existing_habit.save()
+  for value in [datetime(2025, 3, 10), datetime(2025, 3, 12), datetime(2025, 2, 3), datetime(2020, 1, 1)]:
+    Completion.objects.create(completion_habit_id=existing_habit, completion_date=value)
+
+  data = Report.completion_history_data(existing_habit, today=date(2025, 3, 13))
+
+  assert data["bucket"] == bucket and len(data["x"]) == len(data["y"]) == size
+  assert sum(data["y"]) == 3 and data["y"][-1] == 2 # This week or month
+  assert data["x"][-1] == ("2025-03-10" if bucket == "week" else "2025-03-01")
+
+def test_habit_history_data_heatmap_window(existing_habit):
+  """
+  Test that the daily heatmap only holds the last HISTORY_WEEKS weeks, whatever the size of the history.
+  """
+  today = date(2025, 3, 13) # A Thursday
+  Completion.objects.bulk_create([ # Streak runs are not needed here
+    Completion(completion_habit_id=existing_habit, completion_date=datetime.combine(value, datetime.min.time()), completion_day=value.toordinal())
+    for value in (today - timedelta(days=days) for days in range(0, 3650, 3))
+  ])
+
+  data = Report.completion_history_data(existing_habit, today=today)
+
+  assert data["x"][-1] == "2025-03-10" and len(data["x"]) == Report.HISTORY_WEEKS
+  assert data["z"][3][-1] == 1 and data["z"][4][-1] is None # Today completed, tomorrow empty
+  assert sum(count or 0 for row in data["z"] for count in row) == len(range(0, 7 * 52 + 4, 3))
+
+def test_habit_detail_view_pages_history(client, existing_habit, settings):
+  """
+  Test that the detail page lists one page of the history, newest first, with links to older and newer pages.
+  """
+  settings.HABITS_HISTORY_PAGE_SIZE = 2
+  for day in range(1, 6):
+    Completion.objects.create(completion_habit_id=existing_habit, completion_date=datetime(2025, 3, day))
+  url = reverse("habit_detail", args=[existing_habit.habit_id])
+
+  first = client.get(url)
+  assert [c.completion_date.day for c in first.context["completions"]] == [5, 4]
+  assert first.context["newer_url"] is None
+
+  second = client.get(url + first.context["older_url"])
+  assert [c.completion_date.day for c in second.context["completions"]] == [3, 2]
+
+  back = client.get(url + second.context["newer_url"])
+  assert [c.completion_date.day for c in back.context["completions"]] == [5, 4]
+
+def test_habit_streak_data(client, existing_habit):
+  """
+  Test that a habit's streak series has one point per day of the window, with the best streak so far.
+  """
+  today = datetime.now().date()
+  for days in [0, 1, 2, 5, 6, 40]:
+    Completion.objects.create(completion_habit_id=existing_habit, completion_date=today - timedelta(days=days))
+
+  response = client.get(reverse("habit_streak_data", args=[existing_habit.habit_id]), {"range": "30d"})
+
+  data = response.json()
+  assert data["bucket"] == "day" and len(data["x"]) == len(data["current"]) == 30
+  assert data["x"][-1] == today.isoformat() and data["current"][-1] == 3
+  assert data["current"][-7:-3] == [1, 2, 2, 0] # The earlier run lapses after a missed day
+  assert max(data["best"]) == 3 and data["best"][0] == 1 # The run 40 days ago counts from before the window
+  assert "no-cache" in response["Cache-Control"] and response.has_header("ETag")
+
+def test_report_streak_series_weekly(existing_habit):
+  """
+  Test that weekly series start at the first completion and step per ISO week.
+  """
+  existing_habit.habit_occurrence = "weekly"
+  existing_habit.save()
+  for day in [3, 12, 24]:
+    Completion.objects.create(completion_habit_id=existing_habit, completion_date=datetime(2025, 3, day))
+
+  data = Report.streak_series(existing_habit, end=date(2025, 4, 2))
+
+  assert data["x"] == ["2025-03-03", "2025-03-10", "2025-03-17", "2025-03-24", "2025-03-31"]
+  assert data["current"] == [1, 2, 2, 1, 1] and data["best"] == [1, 2, 2, 2, 2]
@@ -1,4 +1,4 @@
-from .views import habit_list, habit_detail, mark_completed, create_habit, edit_habit, delete_habit, analytics_view
+from .views import habit_list, habit_detail, mark_completed, create_habit, edit_habit, delete_habit, analytics_view, chart_data, habit_history_data, habit_streak_data
 from django.urls import path
 
 urlpatterns = [
@@ -8,5 +8,8 @@ urlpatterns = [
   path("<int:habit_id>/edit/", edit_habit, name="edit_habit"),  # Edit a habit 
   path("<int:habit_id>/delete/", delete_habit, name="delete_habit"),  # Delete a habit
   path("<int:habit_id>/complete/", mark_completed, name="mark_completed"),  # Mark habit as completed
+  path("<int:habit_id>/history.json", habit_history_data, name="habit_history_data"),  # Habit history chart data
+  path("<int:habit_id>/streaks.json", habit_streak_data, name="habit_streak_data"),  # Habit streak chart data
   path("analytics/", analytics_view, name="analytics"),  # View habit analytics
+  path("analytics/charts/<slug:chart>.json", chart_data, name="chart_data"),  # Analytics chart data
 ]
@@ -1,38 +1,158 @@
+from .chart_cache import cached_chart, chart_etag
 from .forms import HabitForm
+from .leaderboard import SCOPES
 from .models import Habit, Completion, Report
-from datetime import datetime
+from .pagination import HISTORY_SORTS, SORTS, paginate
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.utils.safestring import mark_safe
-import plotly.graph_objects as go
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
+from urllib.parse import urlencode
+import json
+
+# Number of streak runs on the habit detail timeline
+TIMELINE_RUNS = 10
+
+# Data of the analytics charts, by name, given the trend range and bucket and the leaderboard scope
+CHARTS = {
+  "trend": lambda trend_range, trend_bucket, scope: Report.completion_trend_data(trend_range, trend_bucket),
+  "status": lambda trend_range, trend_bucket, scope: Report.status_data(),
+  "streak": lambda trend_range, trend_bucket, scope: Report.streak_data(scope=scope),
+}
+
+def _trend_params(request):
+  """
+  Returns the trend chart range and bucket from the query string, e.g. ?range=90d&bucket=week.
+  """
+  trend_range = request.GET.get("range", "all")
+  if trend_range not in Report.TREND_RANGES:
+    trend_range = "all"
+  trend_bucket = request.GET.get("bucket")
+  if trend_bucket not in Report.TREND_BUCKETS:
+    trend_bucket = None
+  return trend_range, trend_bucket
+
+def _leaderboard_scope(request):
+  """
+  Returns the streak leaderboard scope from the query string, e.g. ?scope=occurrence:daily.
+  """
+  scope = request.GET.get("scope", "all")
+  return scope if scope in SCOPES else "all"
+
+def _page_size(request):
+  """
+  Returns the habit list page size from the query string, e.g. ?page_size=50, within 1 and HABITS_MAX_PAGE_SIZE.
+  """
+  try:
+    page_size = int(request.GET.get("page_size", settings.HABITS_PAGE_SIZE))
+  except ValueError:
+    page_size = settings.HABITS_PAGE_SIZE
+  return min(max(page_size, 1), settings.HABITS_MAX_PAGE_SIZE)
 
 def analytics_view(request):
   """
   Displays habit analytics, including longest streaks, habit status breakdown, and completion trends.
 
+  Only the counters are computed here. The charts are drawn in the browser from
+  chart_data() once they scroll into view, with the trend chart window and bucket
+  size taken from the "range" (30d, 90d, 1y, all) and "bucket" (day, week, month)
+  query parameters, and the streak leaderboard from "scope" (all, occurrence:daily,
+  status:active, ...).
+
   Args:
     request (HttpRequest): The HTTP request object.
 
   Returns:
     HttpResponse: The rendered analytics page.
   """
-  habits = Habit.objects.all()
-  longest_streak_habits = Report.get_habits_with_longest_streak()
-  completion_trend_chart = Report.generate_completion_trend_chart()
-  total_completions, active_completions, other_completions = Report.habits_completed_count()
+  trend_range, trend_bucket = _trend_params(request)
 
   context = {
-    "habits": habits,
-    "longest_streak_habits": longest_streak_habits,
-    "status_chart_html": Report.generate_status_chart(),
-    "streak_chart_html": Report.generate_streak_chart(),
-    "completion_trend_chart": completion_trend_chart,
-    "total_completions": total_completions, 
-    "active_completions": active_completions,
-    "other_completions": other_completions,
+    "snapshot": Report.snapshot(),
+    "trend_range": trend_range,
+    "trend_bucket": trend_bucket or "auto",
+    "scope": _leaderboard_scope(request),
+    "scopes": SCOPES,
   }
 
   return render(request, "habits/analytics.html", context)
 
+@cache_control(private=True, no_cache=True)
+@etag(lambda request, chart: chart_etag())
+def chart_data(request, chart):
+  """
+  Returns the data of one analytics chart as JSON column arrays.
+
+  Browsers keep the response and revalidate it with its ETag, which only
+  changes when the habits or completions do.
+
+  Args:
+    request (HttpRequest): The HTTP request object.
+    chart (str): One of "trend", "status", "streak". The streak chart reads the "scope" leaderboard.
+
+  Returns:
+    HttpResponse: The chart data as JSON.
+  """
+  if chart not in CHARTS:
+    raise Http404("Unknown chart")
+
+  trend_range, trend_bucket = _trend_params(request)
+  scope = _leaderboard_scope(request)
+  key_parts = {"trend": (trend_range, trend_bucket), "streak": (scope,)}.get(chart, ())
+  payload = cached_chart(f"{chart}-data", lambda: json.dumps(CHARTS[chart](trend_range, trend_bucket, scope)), *key_parts)
+
+  return HttpResponse(payload, content_type="application/json")
+
+@cache_control(private=True, no_cache=True)
+@etag(lambda request, habit_id: chart_etag(habit_id))
+def habit_history_data(request, habit_id):
+  """
+  Returns the completions of a habit per calendar bucket as JSON, for its completion history chart.
+
+  Args:
+    request (HttpRequest): The HTTP request object.
+    habit_id (int): The ID of the habit.
+
+  Returns:
+    HttpResponse: The chart data as JSON.
+  """
+  habit = get_object_or_404(Habit, habit_id=habit_id)
+  payload = cached_chart("history-data", lambda: json.dumps(Report.completion_history_data(habit)), habit_id=habit_id)
+
+  return HttpResponse(payload, content_type="application/json")
+
+@cache_control(private=True, no_cache=True)
+@etag(lambda request, habit_id: chart_etag(habit_id))
+def habit_streak_data(request, habit_id):
+  """
+  Returns the current and best streak of a habit over time as JSON, for its streak chart.
+
+  The window is taken from the "range" query parameter (30d, 90d, 1y, all), defaulting to 1y.
+
+  Args:
+    request (HttpRequest): The HTTP request object.
+    habit_id (int): The ID of the habit.
+
+  Returns:
+    HttpResponse: The chart data as JSON.
+  """
+  habit = get_object_or_404(Habit, habit_id=habit_id)
+  series_range = request.GET.get("range", "1y")
+  if series_range not in Report.TREND_RANGES:
+    series_range = "1y"
+
+  def build():
+    days = Report.TREND_RANGES[series_range]
+    start = None if days is None else datetime.now().date() - timedelta(days=days - 1)
+    return json.dumps(Report.streak_series(habit, start))
+
+  payload = cached_chart("streak-series-data", build, series_range, habit_id=habit_id)
+  return HttpResponse(payload, content_type="application/json")
+
 def create_habit(request):
   """
   Allows the user to create a new habit using a form.
@@ -65,7 +185,7 @@ def delete_habit(request, habit_id):
   habit = get_object_or_404(Habit, habit_id=habit_id)
 
   if request.method == "POST":
-    habit.delete()
+    habit.delete()  # Its completions leave the rollup with it, see signals.py
     return redirect("habit_list")
 
   return render(request, "habits/delete_habit.html", {"habit": habit})
@@ -92,6 +212,7 @@ def edit_habit(request, habit_id):
     updated_habit = form.save(commit=False)
     new_status = form.cleaned_data["habit_status"]
     new_occurrence = form.cleaned_data["habit_occurrence"]
+    deleted = 0
 
     # === Status change logic ===
     if old_status == "active" and new_status == "paused":
@@ -102,14 +223,22 @@ def edit_habit(request, habit_id):
 
     elif new_status == "inactive":
       updated_habit.habit_last_streak = 0
-      Completion.objects.filter(completion_habit_id=habit, completion_date=current).update(completion_deleted=True)
+      completion = Completion.objects.filter(
+        completion_habit_id=habit, completion_day=current.toordinal(), completion_deleted=False
+      ).first()
+      if completion:  # save() takes it out of the streak runs and the rollup
+        completion.completion_deleted = True
+        completion.save(update_fields=["completion_deleted"])
+        deleted = 1
 
     # === Occurrence change logic ===
-    if old_occurrence != new_occurrence:
-      # When occurrence changes, recalculate streak
-      updated_habit.habit_last_streak = updated_habit.get_current_streak()
-
+    # When occurrence changes, the periods change too, so save() rebuilds the streak runs,
+    # and it counts the habit's completions under the new status in the rollup
     updated_habit.save()
+
+    if old_occurrence != new_occurrence or deleted:
+      updated_habit.refresh_streaks()
+    Habit.flush_pending_streaks()
     return redirect("habit_detail", habit_id=habit.habit_id)
 
   return render(request, "habits/edit_habit.html", {"form": form, "habit": habit})
@@ -119,6 +248,10 @@ def habit_detail(request, habit_id):
   """
   Display details of a specific habit.
 
+  The completion history is listed one page at a time, newest first, next to
+  the latest streak runs, and the chart is drawn from the aggregated counts of
+  habit_history_data().
+
   Args:
     request (HttpRequest): The HTTP request object.
     habit_id (int): The ID of the habit to display.
@@ -129,32 +262,26 @@ def habit_detail(request, habit_id):
   habit = get_object_or_404(Habit, habit_id=habit_id)
   current = datetime.now()
   current_date = current.date()
-  completions = Completion.objects.filter(completion_habit_id=habit, completion_deleted=False).order_by("-completion_date")
-  latest_completion = completions.first()
-
-  # Generate a bar chart for completion history
-  dates = [c.completion_date.strftime("%Y-%m-%d") for c in completions]
-  counts = [1] * len(dates)
-
-  fig = go.Figure()
-  fig.add_trace(go.Bar(x=dates, y=counts, marker_color="blue"))
-  fig.update_layout(
-    title=f"Completion History for {habit.habit_name}",
-    xaxis_title="Date",
-    yaxis_title="Completed",
-    yaxis=dict(tickvals=[1], ticktext=["✔"]),
-    height=300
+  completions = Completion.objects.filter(completion_habit_id=habit, completion_deleted=False)
+  latest_completion = completions.order_by("-completion_day").first()
+  completed_today = latest_completion is not None and latest_completion.completion_date.date() == current_date
+
+  # Only one page of the history is loaded, newer and older pages follow the cursors
+  page = paginate(
+    completions, "recent", settings.HABITS_HISTORY_PAGE_SIZE,
+    after=request.GET.get("after"), before=request.GET.get("before"), sorts=HISTORY_SORTS,
   )
 
-  completion_history_chart_html = mark_safe(fig.to_html(include_plotlyjs=False, full_html=False))
-
   context = {
     "habit": habit,
-    "completions": completions,
+    "streak_runs": habit.streak_runs.order_by("-run_end_period")[:TIMELINE_RUNS],
+    "completions": page.items,
+    "older_url": "?" + urlencode({"after": page.next_cursor}) if page.next_cursor else None,
+    "newer_url": "?" + urlencode({"before": page.prev_cursor}) if page.prev_cursor else None,
     "today": current,
     "today_date": current_date,
     "latest_completion": latest_completion,
-    "completion_history_chart_html": completion_history_chart_html
+    "completed_today": completed_today,
   }
   return render(request, "habits/habit_detail.html", context)
 
@@ -162,33 +289,48 @@ def habit_list(request):
   """
   Display a list of all habits with sorting and filtering options.
 
+  The list is paged with keyset cursors ("after" and "before") over the sort key
+  and habit ID, so every page costs one indexed query however deep it is.
+
   Args:
     request (HttpRequest): The HTTP request object.
 
   Returns:
     HttpResponse: The rendered habit list page.
   """
-  habits = Habit.objects.all()
   current_date = datetime.now().date()
+
+  # Flag habits completed today in the same query, instead of loading every completion
+  completed_today = Completion.objects.filter(
+    completion_habit_id=OuterRef("pk"), completion_day=current_date.toordinal(), completion_deleted=False
+  )
+  habits = Habit.objects.annotate(completed_today=Exists(completed_today))
   sort_by = request.GET.get("sort_by", "habit_name")
   filter_by_occurrence = request.GET.get("filter_by_occurrence", "all")
   filter_by_status = request.GET.get("filter_by_status", "active")  # Default to active
 
-  # Handle sorting
+  # Only indexed sort keys are allowed, anything else falls back to the name
+  if sort_by not in SORTS:
+    sort_by = "habit_name"
+
   if filter_by_occurrence in ["daily", "weekly", "monthly"]:
     habits = habits.filter(habit_occurrence=filter_by_occurrence)
 
   if filter_by_status in ["active", "paused", "inactive"]:
     habits = habits.filter(habit_status=filter_by_status)
 
-  if sort_by == "streak":
-    habits = habits.order_by("-habit_best_streak")
-  else:
-    habits = habits.order_by(sort_by)
+  # Handle keyset pagination
+  page = paginate(habits, sort_by, _page_size(request), after=request.GET.get("after"), before=request.GET.get("before"))
+
+  def page_url(**cursor):
+    params = {key: value for key, value in request.GET.items() if key not in ("after", "before")}
+    return "?" + urlencode({**params, **cursor})
 
   current = datetime.now()
   context = {
-    "habits": habits,
+    "habits": page.items,
+    "next_url": page_url(after=page.next_cursor) if page.next_cursor else None,
+    "prev_url": page_url(before=page.prev_cursor) if page.prev_cursor else None,
     "today": current,
     "sort_by": sort_by,
     "filter_by_occurrence": filter_by_occurrence,
@@ -211,15 +353,32 @@ def mark_completed(request, habit_id):
   habit = get_object_or_404(Habit, habit_id=habit_id)
   current = datetime.now()
 
-  completion, created = Completion.objects.get_or_create(completion_habit_id=habit, completion_date=current)
-  
-  # If the completion already exists and is marked as deleted, restore it
-  if not created and completion.completion_deleted:
-    completion.completion_deleted = False
-    completion.save()
+  # Today's completion, preferring a live one over a soft-deleted one
+  completion = habit.completions.filter(completion_day=current.toordinal()).order_by("completion_deleted").first()
+  changed = True
+
+  # The completion and the streak counters are saved together, or not at all
+  try:
+    with transaction.atomic():
+      if completion is None:
+        completion = Completion.objects.create(completion_habit_id=habit, completion_date=current)
+
+      # If the completion already exists and is marked as deleted, restore it
+      elif completion.completion_deleted:
+        completion.completion_deleted = False
+        completion.save(update_fields=["completion_deleted"])
+
+      else:  # Already completed today
+        changed = False
+
+      # Update streak immediately after new completion, without rescanning the history
+      if changed:
+        habit.record_completion(completion.completion_date)
+  except IntegrityError:  # Completed concurrently by another request
+    pass
 
-  # Update streak immediately after new completion
-  habit.get_current_streak()
+  # Piggyback the streaks that read-only pages found stale on this write
+  Habit.flush_pending_streaks()
 
   return redirect("habit_detail", habit_id=habit_id)
 
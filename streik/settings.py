@@ -82,6 +82,22 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Rendered charts are cached until their data changes. LocMemCache is private to
+# each process, so use a shared backend (e.g. Redis) with several workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "streik",
+        "OPTIONS": {
+            "MAX_ENTRIES": 500,  # Least recently used entries are culled beyond this
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -122,7 +138,43 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
+# collectstatic stores content-hashed copies (cacheable forever) with .gz/.br variants
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "habits.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Habits
+# Where streaks are computed: "python" scans the completion dates in Python,
+# "sql" computes them inside the database with window functions (SQLite 3.25+).
+
+HABITS_STREAK_BACKEND = "python"
+
+# How long a rendered chart may stay cached, in seconds. Charts are invalidated
+# by data changes anyway, this only bounds the memory held by unused ones.
+
+HABITS_CHART_CACHE_TIMEOUT = 60 * 60 * 24
+
+# The number of habits per page of the habit list, which can be changed with
+# ?page_size= up to HABITS_MAX_PAGE_SIZE.
+
+HABITS_PAGE_SIZE = 25
+HABITS_MAX_PAGE_SIZE = 100
+
+# The number of completions per page of a habit's completion history.
+
+HABITS_HISTORY_PAGE_SIZE = 20
+
+# The number of habits kept on each cached streak leaderboard (all habits, per
+# occurrence and per status).
+
+HABITS_LEADERBOARD_SIZE = 10